@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Render benchmark for reel-maker's core.
+
+Renders the scenes of examples/video5_context_erosion.py through
+core.make_render_frame into a null sink (no encoder) and reports
+ms/frame and frames/sec per scene, for the shared progress-bar and
+caption overlays, for the pipe stage (frame bytes → null sink) and, when
+FFmpeg is installed, for the encode stage (libx264 → null muxer).
+
+Usage:
+    python benchmarks/bench_render.py --out bench.json
+    python benchmarks/bench_render.py --baseline bench.json --threshold 0.15
+
+With --baseline, exits 1 if any stage's ms/frame is more than
+--threshold (fraction) slower than in the baseline results.
+
+benchmarks/baseline.json is a reference run; its "meta" records the
+machine it ran on. Timings only compare on the same machine, so for a
+regression check take a baseline from the commit before your change:
+
+    git stash && python benchmarks/bench_render.py --out benchmarks/baseline.local.json
+    git stash pop && python benchmarks/bench_render.py --baseline benchmarks/baseline.local.json
+
+*.local.json results are kept out of git. Refresh baseline.json (with
+--out) when a change makes a stage deliberately faster or slower.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PIL
+from PIL import Image, ImageDraw
+
+from core.drawing import BG, W, H
+from core.scene_base import (Timeline, draw_caption, draw_progress_bar, make_render_frame,
+                             scaled_size)
+from core.renderer import _DRAFT_X264_ARGS, _encode_cmd, _encode_frames, rgb_to_yuv420p
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "examples", "video5_context_erosion.py")
+FPS = 30
+DURATION = 57
+# meta fields that identify the machine; timings from another one do not compare
+MACHINE_KEYS = ("platform", "cpus", "python", "pillow")
+
+
+# ── Workload ────────────────────────────────────────────
+def load_example(path=EXAMPLE):
+    """(scenes, captions, scene_renderers) from an example renderer script."""
+    spec = importlib.util.spec_from_file_location("bench_example", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    renderers = {s["id"]: getattr(module, f"draw_scene{s['id']}") for s in module.SCENES}
+    return module.SCENES, module.CAPTIONS, renderers
+
+
+def sample_frames(scene, n, fps=FPS):
+    """n frame numbers spread evenly over scene (every frame if it has fewer)."""
+    first, last = int(scene["start"] * fps), int(scene["end"] * fps)
+    if last - first <= n:
+        return list(range(first, last))
+    return [first + i * (last - first) // n for i in range(n)]
+
+
+def _time(fn, items, repeat):
+    """Best-of-repeat timing of fn over items, as a stage result dict."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    ms = best / len(items) * 1000
+    return {"frames": len(items), "ms_per_frame": round(ms, 3),
+            "fps": round(1000 / ms, 1) if ms else None}
+
+
+# ── Stages ──────────────────────────────────────────────
+def bench_scenes(render_frame, scenes, n, repeat):
+    results = {}
+    for scene in scenes:
+        frames = sample_frames(scene, n)
+        results[f"scene_{scene['id']}"] = _time(lambda f: render_frame(f / FPS), frames, repeat)
+    return results
+
+
+def bench_overlays(scenes, captions, n, repeat):
+    timeline = Timeline(scenes, captions, DURATION)
+    img = Image.new('RGB', (W, H), BG)
+    draw = ImageDraw.Draw(img)
+    times = [f / FPS for f in range(0, DURATION * FPS, max(1, DURATION * FPS // n))]
+    return {
+        "progress_bar": _time(lambda t: draw_progress_bar(draw, t, scenes, DURATION,
+                                                          timeline=timeline, img=img),
+                              times, repeat),
+        "caption": _time(lambda t: draw_caption(draw, t, captions, timeline, img=img),
+                         times, repeat),
+    }
+
+
+def bench_pipe(frames, size, pix_fmt, repeat):
+    """Frame bytes (converted if pix_fmt is yuv420p) written to a null sink."""
+    with open(os.devnull, 'wb') as sink:
+        def write(img):
+            data = img.tobytes()
+            if pix_fmt == 'yuv420p':
+                data = rgb_to_yuv420p(data, size, 4 if img.mode == 'RGBX' else 3)
+            sink.write(data)
+        return {"pipe": _time(write, frames, repeat)}
+
+
+def bench_encode(frames, size, pix_fmt, timeline, repeat, x264_args=None):
+    """libx264 throughput through the real encoder pipeline, muxed to null."""
+    if not shutil.which("ffmpeg"):
+        return {"encode": {"skipped": "ffmpeg not found"}}
+    in_fmt = {'RGB': 'rgb24', 'RGBX': 'rgb0'}[frames[0].mode]
+    data = [img.tobytes() for img in frames]
+    if pix_fmt == 'yuv420p':
+        data = [rgb_to_yuv420p(d, size, 4 if in_fmt == 'rgb0' else 3) for d in data]
+        in_fmt = 'yuv420p'
+    extra = {"x264_args": x264_args} if x264_args else {}
+    cmd = _encode_cmd('-', FPS, in_fmt, faststart=False, size=size, **extra)[:-1]
+    cmd += ['-f', 'null', '-']
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        returncode, stderr, _ = _encode_frames(cmd, iter(data), timeline, FPS)
+        if returncode != 0:
+            return {"encode": {"error": stderr[-500:]}}
+        best = min(best, time.perf_counter() - start)
+    ms = best / len(data) * 1000
+    return {"encode": {"frames": len(data), "ms_per_frame": round(ms, 3),
+                       "fps": round(1000 / ms, 1)}}
+
+
+# ── Baseline Comparison ─────────────────────────────────
+def compare(results, baseline, threshold):
+    """Rows of (stage, baseline ms, current ms, change, regressed)."""
+    rows = []
+    for stage, cur in results["stages"].items():
+        base = baseline.get("stages", {}).get(stage, {})
+        if "ms_per_frame" not in cur or "ms_per_frame" not in base:
+            continue
+        change = cur["ms_per_frame"] / base["ms_per_frame"] - 1
+        rows.append((stage, base["ms_per_frame"], cur["ms_per_frame"], change,
+                     change > threshold))
+    return rows
+
+
+def run(args):
+    scenes, captions, renderers = load_example(args.example)
+    scale = args.draft or 1
+    size = scaled_size(scale)
+    render_frame = make_render_frame(scenes, captions, renderers, DURATION,
+                                     reuse_buffer=args.reuse_buffer,
+                                     incremental=args.incremental, scale=scale)
+    stages = bench_scenes(render_frame, scenes, args.frames, args.repeat)
+    stages.update(bench_overlays(scenes, captions, args.frames * len(scenes), args.repeat))
+
+    # Distinct frames from every scene feed the pipe and encode stages
+    frames = [render_frame(f / FPS).copy()
+              for s in scenes for f in sample_frames(s, args.frames)]
+    pix_fmt = 'yuv420p' if args.yuv420p else None
+    stages.update(bench_pipe(frames, size, pix_fmt, args.repeat))
+    if not args.no_encode:
+        stages.update(bench_encode(frames, size, pix_fmt, render_frame.timeline, args.repeat,
+                                   _DRAFT_X264_ARGS if args.draft else None))
+
+    return {
+        "meta": {
+            "example": os.path.basename(args.example),
+            "frames_per_scene": args.frames,
+            "repeat": args.repeat,
+            "size": list(size),
+            "options": {"reuse_buffer": args.reuse_buffer, "incremental": args.incremental,
+                        "yuv420p": args.yuv420p, "scale": scale},
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "stages": stages,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--example", default=EXAMPLE, help="renderer script to benchmark")
+    parser.add_argument("--frames", type=int, default=20, help="frames sampled per scene")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage (best is kept)")
+    parser.add_argument("--reuse-buffer", action="store_true")
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--yuv420p", action="store_true", help="convert frames in the pipe stage")
+    parser.add_argument("--draft", type=float, metavar="SCALE",
+                        help="benchmark a draft render at this scale (e.g. 0.5)")
+    parser.add_argument("--no-encode", action="store_true", help="skip the FFmpeg stage")
+    parser.add_argument("--out", help="write JSON results here")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown vs baseline (default 0.10 = 10%%)")
+    args = parser.parse_args()
+
+    results = run(args)
+
+    print(f"{'stage':<14} {'ms/frame':>10} {'fps':>8}")
+    for stage, r in results["stages"].items():
+        if "ms_per_frame" in r:
+            print(f"{stage:<14} {r['ms_per_frame']:>10.2f} {r['fps']:>8.1f}")
+        else:
+            print(f"{stage:<14} {'—':>10} {'':>8}  {r.get('skipped') or r.get('error')}")
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults: {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.threshold)
+        if baseline.get("meta", {}).get("options") != results["meta"]["options"]:
+            print("\n⚠️  Baseline was run with different options; timings may not compare")
+        machine = [k for k in MACHINE_KEYS
+                   if baseline.get("meta", {}).get(k) != results["meta"][k]]
+        if machine:
+            print(f"\n⚠️  Baseline is from another machine ({', '.join(machine)} differ); "
+                  f"take one here from the previous commit (see bench_render.py)")
+        print(f"\nvs {args.baseline} (threshold +{args.threshold:.0%}):")
+        for stage, base, cur, change, regressed in rows:
+            mark = "  REGRESSION" if regressed else ""
+            print(f"  {stage:<14} {base:>8.2f} → {cur:>8.2f} ms  {change:+6.1%}{mark}")
+        failed = [row[0] for row in rows if row[4]]
+        if failed:
+            print(f"\n❌ {len(failed)} stage(s) regressed: {', '.join(failed)}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+
+if __name__ == '__main__':
+    main()
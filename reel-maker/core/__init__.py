@@ -1,4 +1,6 @@
 from .drawing import *
-from .scene_base import draw_progress_bar, draw_caption, make_render_frame
+from .scene_base import draw_progress_bar, draw_caption, make_render_frame, scaled_size, Timeline, invalidates
 from .renderer import render_to_mp4, validate_output
 from .tts import generate_narration, mux_audio_video, detect_backend
+from .profiling import Profiler
+from .pipeline import make_reel
@@ -0,0 +1,164 @@
+"""
+Keyframe and easing engine for scene animation values.
+
+A scene declares its animation tracks once. Every track is evaluated for
+every frame of the scene in one NumPy pass, and the renderer looks values
+up by progress instead of redoing the math on each frame:
+
+    from core.animation import Animation, oscillate, stagger, tween
+
+    anim1 = Animation(SCENES[0],
+                      gx=oscillate(40, amp=12),
+                      gy=oscillate(35, amp=8, fn="cos"),
+                      title_op=tween(0, 1, start=0.4, end=0.6),
+                      blocks=stagger(12, delay=0.07, ease="ease_out"))
+
+    def draw_scene1(draw, img, p):
+        a = anim1.at(p)
+        bcx = cx + int(a.gx)
+        for i, op in enumerate(a.blocks): ...
+
+A track is any function mapping a progress array of shape (n,) to an array
+of shape (n,) or (n, k); the factories below cover the cookbook patterns.
+Animations built at module level are computed once in the parent process
+and inherited by forked render workers. Requires NumPy.
+"""
+
+import math
+from types import SimpleNamespace
+
+import numpy as np
+
+
+# ── Easing ──────────────────────────────────────────────
+EASINGS = {
+    "linear": lambda x: x,
+    "ease_in": lambda x: x * x,
+    "ease_out": lambda x: 1 - (1 - x) * (1 - x),
+    "ease_in_out": lambda x: 3 * x * x - 2 * x * x * x,
+    "ease_in_cubic": lambda x: x ** 3,
+    "ease_out_cubic": lambda x: 1 - (1 - x) ** 3,
+    "ease_in_out_sine": lambda x: 0.5 - 0.5 * np.cos(np.pi * x),
+    "ease_out_back": lambda x: 1 + 2.70158 * (x - 1) ** 3 + 1.70158 * (x - 1) ** 2,
+}
+
+
+def _ease(ease):
+    """Easing function by name, or ease itself if it is already a function."""
+    return EASINGS[ease] if isinstance(ease, str) else ease
+
+
+# ── Tracks ──────────────────────────────────────────────
+def tween(v0, v1, start=0.0, end=1.0, ease="linear"):
+    """v0 → v1 between progress start and end, held outside it. Values may be tuples."""
+    v0, v1 = np.asarray(v0, float), np.asarray(v1, float)
+    f = _ease(ease)
+
+    def track(p):
+        x = f(np.clip((p - start) / (end - start), 0, 1))
+        return v0 + np.multiply.outer(x, v1 - v0)
+
+    return track
+
+
+def keyframes(points, ease="linear"):
+    """
+    Piecewise interpolation through [(progress, value), ...], eased per
+    segment and held before the first and after the last keyframe.
+    """
+    if len(points) < 2:
+        raise ValueError("keyframes needs at least two (progress, value) points")
+    points = sorted(points, key=lambda kf: kf[0])
+    ps = np.array([kf[0] for kf in points], float)
+    vs = np.array([kf[1] for kf in points], float)
+    f = _ease(ease)
+
+    def track(p):
+        i = np.clip(np.searchsorted(ps, p, side="right") - 1, 0, len(ps) - 2)
+        span = ps[i + 1] - ps[i]
+        x = f(np.clip((p - ps[i]) / np.where(span > 0, span, 1), 0, 1))
+        if vs.ndim > 1:
+            x = x[:, None]
+        return vs[i] + (vs[i + 1] - vs[i]) * x
+
+    return track
+
+
+def stagger(count, delay=0.15, duration=None, start=0.0, ease="linear"):
+    """
+    0 → 1 reveal for count elements, element i starting at start + i × delay.
+    Without duration each element finishes at progress 1 (the cookbook's
+    stagger()); with it, each takes duration. Shape (n, count).
+    """
+    offsets = start + np.arange(count) * delay
+    spans = np.maximum(1 - offsets, 1e-9) if duration is None else np.full(count, duration)
+    f = _ease(ease)
+
+    def track(p):
+        return f(np.clip((p[:, None] - offsets) / spans, 0, 1))
+
+    return track
+
+
+def oscillate(freq, amp=1.0, phase=0.0, offset=0.0, fn="sin"):
+    """offset + amp × sin(progress × freq + phase) (or cos), e.g. glitch jitter."""
+    wave = {"sin": np.sin, "cos": np.cos}[fn]
+
+    def track(p):
+        return offset + amp * wave(p * freq + phase)
+
+    return track
+
+
+# ── Scene Animation ─────────────────────────────────────
+class Animation:
+    """
+    Tracks of one scene, evaluated for all of its frames at construction.
+
+    at(progress) returns that frame's values as attributes: floats, or
+    lists of floats for multi-valued tracks. Progress values that are not
+    on the scene's frame grid (another fps, previews) are evaluated on
+    demand, so results never depend on the lookup.
+    """
+
+    def __init__(self, scene, fps=30, **tracks):
+        if not tracks:
+            raise ValueError("Animation needs at least one track (name=track keyword)")
+        self.scene = scene
+        self.fps = fps
+        self.tracks = tracks
+
+        # Same progress values the renderer computes (Timeline.scene_progress)
+        start, end = scene["start"], scene["end"]
+        progress = {0.0, 1.0}
+        for frame in range(math.floor(start * fps), math.ceil(end * fps) + 1):
+            t = frame / fps
+            if start <= t < end:
+                progress.add(max(0, min(1, (t - start) / (end - start))))
+
+        self.progress = np.array(sorted(progress), float)
+        self.tables = self.evaluate(self.progress)
+        self._frames = dict(zip(self.progress.tolist(),
+                                self._rows(self.tables, len(self.progress))))
+
+    def evaluate(self, progress):
+        """{track name: values at each progress}, for a progress array."""
+        tables = {}
+        for name, track in self.tracks.items():
+            values = np.asarray(track(progress), float)
+            if values.shape[:1] != progress.shape:
+                values = np.broadcast_to(values, progress.shape + values.shape[1:])
+            tables[name] = values
+        return tables
+
+    def _rows(self, tables, n):
+        columns = {name: values.tolist() for name, values in tables.items()}
+        return [SimpleNamespace(**{name: col[k] for name, col in columns.items()})
+                for k in range(n)]
+
+    def at(self, progress):
+        """Track values at progress (precomputed for every frame of the scene)."""
+        frame = self._frames.get(progress)
+        if frame is None:
+            frame = self._rows(self.evaluate(np.array([float(progress)])), 1)[0]
+        return frame
@@ -0,0 +1,292 @@
+"""
+NumPy audio engine for reel-maker's narration pipeline.
+
+Covers what the FFmpeg audio graphs used to do, in process:
+  - resample, EQ and compression (Flite voice post-processing)
+  - time_stretch: WSOLA tempo change to an exact sample count (atempo)
+  - loudness / normalize_loudness: EBU R128 measurement and gain (loudnorm)
+  - mix_at: sample-exact placement into one buffer (adelay + amix)
+
+Samples are mono float32 arrays in [-1, 1] plus a sample rate. Filters
+are applied to the whole clip in the frequency domain: a scene's speech
+is a few seconds long, so one FFT per clip is cheaper than a per-sample
+recursion in Python and needs no FFmpeg process. Requires NumPy.
+"""
+
+import math
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 44100
+
+
+# ── WAV I/O ─────────────────────────────────────────────
+def read_wav(path):
+    """(float32 mono samples, sample rate) from a 16-bit PCM WAV."""
+    with wave.open(path, 'rb') as w:
+        rate, channels, width = w.getframerate(), w.getnchannels(), w.getsampwidth()
+        data = w.readframes(w.getnframes())
+    if width != 2:
+        raise ValueError(f"{path}: expected 16-bit PCM, got {width * 8}-bit")
+    samples = np.frombuffer(data, '<i2').astype(np.float32) / 32768
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+def to_pcm16(samples):
+    """s16le bytes of float samples (clipped to [-1, 1])."""
+    return (np.clip(samples, -1, 1) * 32767).round().astype('<i2').tobytes()
+
+
+def write_wav(path, samples, rate=SAMPLE_RATE):
+    """Write float samples as a mono 16-bit PCM WAV."""
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(to_pcm16(samples))
+    return path
+
+
+def db(x):
+    return 20 * math.log10(max(x, 1e-10))
+
+
+# ── Filters ─────────────────────────────────────────────
+def resample(samples, rate, new_rate=SAMPLE_RATE):
+    """Band-limited resample by zero-padding (or truncating) the spectrum."""
+    if rate == new_rate or not len(samples):
+        return samples.astype(np.float32)
+    n = int(round(len(samples) * new_rate / rate))
+    out = np.fft.irfft(np.fft.rfft(samples), n) * (n / len(samples))
+    return out.astype(np.float32)
+
+
+def _biquad_response(kind, f0, rate, freqs, q=math.sqrt(0.5), gain_db=0.0, octaves=1.0):
+    """|H| at freqs (Hz) of an RBJ cookbook biquad, as FFmpeg's filters use."""
+    w0 = 2 * math.pi * f0 / rate
+    cos, sin = math.cos(w0), math.sin(w0)
+    if kind == "peak":
+        alpha = sin * math.sinh(math.log(2) / 2 * octaves * w0 / sin)
+        a = 10 ** (gain_db / 40)
+        b, den = (1 + alpha * a, -2 * cos, 1 - alpha * a), (1 + alpha / a, -2 * cos, 1 - alpha / a)
+    else:
+        alpha = sin / (2 * q)
+        if kind == "highpass":
+            b = ((1 + cos) / 2, -(1 + cos), (1 + cos) / 2)
+        else:
+            b = ((1 - cos) / 2, 1 - cos, (1 - cos) / 2)
+        den = (1 + alpha, -2 * cos, 1 - alpha)
+    return _response(b, den, rate, freqs)
+
+
+def _response(b, a, rate, freqs):
+    z = np.exp(-1j * 2 * np.pi * freqs / rate)
+    return np.abs((b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z))
+
+
+def equalize(samples, rate, bands):
+    """
+    Apply biquad bands in one FFT pass (zero-phase). bands: tuples of
+    ("highpass"|"lowpass", f0) or ("peak", f0, gain_db, octaves).
+    """
+    if not len(samples):
+        return samples
+    spectrum = np.fft.rfft(samples)
+    freqs = np.fft.rfftfreq(len(samples), 1 / rate)
+    for band in bands:
+        if band[0] == "peak":
+            _, f0, gain_db, octaves = band
+            spectrum *= _biquad_response("peak", f0, rate, freqs, gain_db=gain_db, octaves=octaves)
+        else:
+            spectrum *= _biquad_response(band[0], band[1], rate, freqs)
+    return np.fft.irfft(spectrum, len(samples)).astype(np.float32)
+
+
+def compress(samples, rate, threshold_db=-20.0, ratio=3.0, attack=0.005, release=0.05,
+             block=0.005):
+    """
+    Downward compressor: RMS level per block, smoothed with attack/release,
+    reduced by ratio above threshold; gains are interpolated per sample.
+    """
+    size = max(1, int(rate * block))
+    n_blocks = -(-len(samples) // size)
+    if not n_blocks:
+        return samples
+    padded = np.zeros(n_blocks * size, np.float32)
+    padded[:len(samples)] = samples
+    level = 10 * np.log10(np.maximum((padded.reshape(-1, size) ** 2).mean(axis=1), 1e-20))
+
+    a_att, a_rel = math.exp(-block / attack), math.exp(-block / release)
+    env = np.empty_like(level)
+    e = level[0]
+    for i, x in enumerate(level.tolist()):
+        coeff = a_att if x > e else a_rel
+        e = coeff * e + (1 - coeff) * x
+        env[i] = e
+
+    over = np.maximum(env - threshold_db, 0)
+    gain_db = over / ratio - over
+    centers = (np.arange(n_blocks) + 0.5) * size
+    gain = 10 ** (np.interp(np.arange(len(samples)), centers, gain_db) / 20)
+    return (samples * gain).astype(np.float32)
+
+
+# ── Loudness ────────────────────────────────────────────
+def _k_weighting(rate, freqs):
+    """
+    |H| of the BS.1770 K-weighting filter (a +4 dB high shelf and a 38 Hz
+    high-pass) at rate, derived as libebur128 does; at 48 kHz this gives
+    the coefficients published in the standard.
+    """
+    k = math.tan(math.pi * 1681.974450955533 / rate)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf = _response(((vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0,
+                       (vh - vb * k / q + k * k) / a0),
+                      (1, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0), rate, freqs)
+
+    k = math.tan(math.pi * 38.13547087602444 / rate)
+    q = 0.5003270373238773
+    a0 = 1 + k / q + k * k
+    highpass = _response((1, -2, 1), (1, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0),
+                         rate, freqs)
+    return shelf * highpass
+
+
+def loudness(samples, rate):
+    """
+    Integrated loudness in LUFS (ITU-R BS.1770 / EBU R128): K-weighted
+    power over 400 ms blocks with 75% overlap, gated at -70 LUFS and then
+    10 LU below the ungated mean. -inf for silence.
+    """
+    if not len(samples):
+        return float("-inf")
+    spectrum = np.fft.rfft(samples.astype(np.float64))
+    freqs = np.fft.rfftfreq(len(samples), 1 / rate)
+    spectrum *= _k_weighting(rate, freqs)
+    weighted = np.fft.irfft(spectrum, len(samples))
+
+    block = min(len(weighted), int(0.4 * rate))
+    hop = max(1, block // 4)
+    energy = np.concatenate(([0.0], np.cumsum(weighted ** 2)))
+    starts = np.arange(0, len(weighted) - block + 1, hop)
+    power = (energy[starts + block] - energy[starts]) / block
+
+    power = power[power > 10 ** ((-70 + 0.691) / 10)]
+    if not len(power):
+        return float("-inf")
+    relative = 10 * math.log10(power.mean()) - 10
+    power = power[power > 10 ** (relative / 10)]
+    return -0.691 + 10 * math.log10(power.mean())
+
+
+def true_peak(samples, oversample=4):
+    """Peak magnitude of samples oversampled 4x (BS.1770 true-peak estimate)."""
+    if not len(samples):
+        return 0.0
+    return float(np.abs(np.fft.irfft(np.fft.rfft(samples), len(samples) * oversample)).max()
+                 * oversample)
+
+
+def normalize_loudness(samples, rate, target_lufs=-16.0, peak_db=-1.5):
+    """
+    Gain samples to target_lufs integrated loudness, lowered if needed so
+    the true peak stays at or below peak_db (loudnorm's I and TP targets).
+    """
+    measured = loudness(samples, rate)
+    if not math.isfinite(measured):
+        return samples
+    gain = 10 ** ((target_lufs - measured) / 20)
+    ceiling = 10 ** (peak_db / 20)
+    peak = true_peak(samples) * gain
+    if peak > ceiling:
+        gain *= ceiling / peak
+    return (samples * gain).astype(np.float32)
+
+
+# ── Time Stretch ────────────────────────────────────────
+def time_stretch(samples, length, frame=2048, tolerance=512):
+    """
+    samples sped up or slowed down to exactly length samples, keeping pitch
+    (WSOLA). Hann-windowed frames at 50% overlap are read from the input at
+    their nominal position, shifted by up to ±tolerance to the offset whose
+    waveform best continues the previous frame, and overlap-added.
+    """
+    n_in = len(samples)
+    if length <= 0:
+        return np.zeros(0, np.float32)
+    if n_in == length or n_in == 0:
+        return np.resize(samples.astype(np.float32), length) if n_in else \
+            np.zeros(length, np.float32)
+
+    hop = frame // 2
+    speed = n_in / length                       # input samples per output sample
+    window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(frame) / frame)   # sums to 1 at 50%
+    x = samples.astype(np.float64)
+
+    # Frame k is written at output k·hop; output starts one hop in, where
+    # two windows already overlap, so the centre of frame k (output
+    # (k + 1)·hop) maps to input k·hop·speed
+    n_frames = -(-(length + hop) // hop) + 1
+    out = np.zeros(n_frames * hop + frame)
+    fft_size = 1 << (frame + 2 * tolerance - 1).bit_length()
+    prev = None
+    for k in range(n_frames):
+        nominal = int(round(k * hop * speed)) - hop     # frame centre at input k·hop·speed
+        # Near the end, search within the input rather than fade into silence
+        nominal = min(nominal, max(0, n_in - frame - tolerance))
+        if prev is None:
+            pos = nominal
+        else:
+            # Correlate the natural continuation of the previous frame with
+            # every candidate frame in the search region
+            template = _window_of(x, prev + hop, frame)
+            region = _window_of(x, nominal - tolerance, frame + 2 * tolerance)
+            corr = np.fft.irfft(np.fft.rfft(region, fft_size)
+                                * np.conj(np.fft.rfft(template, fft_size)), fft_size)
+            corr = corr[:2 * tolerance + 1]
+            energy = np.concatenate(([0.0], np.cumsum(region ** 2)))
+            norm = np.sqrt(energy[frame:frame + 2 * tolerance + 1] - energy[:2 * tolerance + 1])
+            pos = nominal - tolerance + int(np.argmax(corr / (norm + 1e-9)))
+        out[k * hop:k * hop + frame] += _window_of(x, pos, frame) * window
+        prev = pos
+    return out[hop:hop + length].astype(np.float32)
+
+
+def _window_of(x, start, size):
+    """x[start:start + size], zero where it runs past either end of x."""
+    lo, hi = max(0, start), min(len(x), start + size)
+    if lo == start and hi - lo == size:
+        return x[lo:hi]
+    out = np.zeros(size)
+    if hi > lo:
+        out[lo - start:hi - start] = x[lo:hi]
+    return out
+
+
+def fit_duration(samples, rate, duration, out_rate=SAMPLE_RATE, target_lufs=-16.0,
+                 peak_db=-1.5):
+    """
+    Speech resampled to out_rate, time-stretched to exactly duration seconds
+    and loudness-normalized (the former atempo + aresample + loudnorm step).
+    """
+    samples = resample(samples, rate, out_rate)
+    if duration > 0 and len(samples):
+        samples = time_stretch(samples, int(round(duration * out_rate)))
+    return normalize_loudness(samples, out_rate, target_lufs, peak_db)
+
+
+# ── Mixing ──────────────────────────────────────────────
+def mix_at(clips, length):
+    """One buffer of length samples with each (offset, samples) added at its offset."""
+    out = np.zeros(length, np.float32)
+    for offset, samples in clips:
+        end = min(length, offset + len(samples))
+        if end > offset:
+            out[offset:end] += samples[:end - offset]
+    return out
@@ -0,0 +1,326 @@
+"""
+Batch renderer for reel-maker: many reels on one shared worker pool.
+
+Usage:
+    python -m core.batch jobs.json                  # manifest
+    python -m core.batch specs/ --workers 16 --per-job 4 --summary summary.json
+
+A manifest is a JSON list of jobs, or {"defaults": {...}, "jobs": [...]};
+a directory is every *.json manifest or job file in it. Each job:
+
+    {
+      "renderer": "examples/video5_context_erosion.py",   # required
+      "output": "out/video5.mp4",                          # required
+      "fps": 30, "duration": 57,                           # optional
+      "draft": false, "yuv420p": false, "reuse_buffer": false
+    }
+
+The renderer module supplies SCENES and CAPTIONS (a job may override
+either with "scenes"/"captions") and a draw_scene_N or draw_sceneN function
+per scene id, or a SCENE_RENDERERS dict; static layers likewise come from
+draw_static_N functions or STATIC_RENDERERS. Relative paths are resolved
+against the manifest's directory.
+
+Every job is split into scene-aligned segments (as with
+render_to_mp4(..., segments=True)) and the segments of all jobs share one
+process pool: at most `workers` segments render at once overall, and at
+most `per_job` from any one job. Pool workers live for the whole batch, so
+renderer modules and fonts loaded for one job stay warm for the next; a
+worker keeps the frame state (static layers, frame buffers) of its last
+JOB_FRAMES_KEPT jobs only.
+"""
+
+import argparse
+import glob
+import importlib.util
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter, OrderedDict, deque
+
+from .renderer import (FRAME_RING, _concat_segments, _encode_cmd, _encode_range,
+                       _render_settings, _scene_segments, validate_output)
+from .scene_base import Timeline, make_render_frame
+
+JOB_KEYS = {"renderer", "output", "fps", "duration", "scenes", "captions",
+            "draft", "yuv420p", "reuse_buffer", "name"}
+
+
+# ── Job Specs ───────────────────────────────────────────
+def _load_manifest(path, keys=JOB_KEYS):
+    """Job dicts from one manifest or job file, paths made absolute."""
+    with open(path) as f:
+        data = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    if isinstance(data, dict) and "jobs" in data:
+        defaults, jobs = data.get("defaults", {}), data["jobs"]
+    else:
+        defaults, jobs = {}, data if isinstance(data, list) else [data]
+
+    resolved = []
+    for n, job in enumerate(jobs):
+        job = {**defaults, **job}
+        unknown = set(job) - keys
+        if unknown:
+            raise ValueError(f"{path}: job {n}: unknown keys {sorted(unknown)}")
+        for key in ("renderer", "output"):
+            if key not in job:
+                raise ValueError(f"{path}: job {n}: missing '{key}'")
+            job[key] = os.path.join(base, job[key])
+        job.setdefault("name", os.path.splitext(os.path.basename(job["output"]))[0])
+        resolved.append(job)
+    return resolved
+
+
+def load_jobs(paths):
+    """Job dicts from manifest files and/or directories of them."""
+    jobs = []
+    for path in paths:
+        files = sorted(glob.glob(os.path.join(path, "*.json"))) if os.path.isdir(path) else [path]
+        for f in files:
+            jobs.extend(_load_manifest(f))
+    return jobs
+
+
+_modules = {}
+
+
+def _renderer_module(path):
+    """Import a renderer script once per process."""
+    if path not in _modules:
+        name = f"reel_job_{len(_modules)}_{os.path.splitext(os.path.basename(path))[0]}"
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[path] = module
+    return _modules[path]
+
+
+def _find_renderers(module, scenes, dict_name, prefix):
+    if hasattr(module, dict_name):
+        return dict(getattr(module, dict_name))
+    found = {}
+    for scene in scenes:
+        for name in (f"{prefix}_{scene['id']}", f"{prefix}{scene['id']}"):
+            if hasattr(module, name):
+                found[scene["id"]] = getattr(module, name)
+                break
+    return found
+
+
+def _job_inputs(job):
+    """(scenes, captions, scene_renderers, static_renderers, duration) for a job."""
+    module = _renderer_module(job["renderer"])
+    scenes = job.get("scenes") or module.SCENES
+    captions = [tuple(c) for c in job.get("captions") or module.CAPTIONS]
+    renderers = _find_renderers(module, scenes, "SCENE_RENDERERS", "draw_scene")
+    missing = [s["id"] for s in scenes if s["id"] not in renderers]
+    if missing:
+        raise ValueError(f"{job['renderer']}: no renderer for scene(s) {missing}")
+    static = _find_renderers(module, scenes, "STATIC_RENDERERS", "draw_static")
+    duration = job.get("duration") or getattr(module, "DURATION", 57)
+    return scenes, captions, renderers, static, duration
+
+
+# ── Pool Workers ────────────────────────────────────────
+# render_frames a worker keeps, most recently used last. Each holds its
+# static layers and, with reuse_buffer, FRAME_RING full-frame buffers, so
+# only the jobs the scheduler is interleaving stay warm, not every job seen.
+JOB_FRAMES_KEPT = 2
+
+_jobs = []
+_job_frames = OrderedDict()
+
+
+def _init_batch_worker(jobs):
+    # Forked workers inherit the renderer modules the parent already imported
+    global _jobs
+    _jobs = jobs
+
+
+def _job_render_frame(j):
+    """This worker's render_frame for job j, built on first use and kept."""
+    if j in _job_frames:
+        _job_frames.move_to_end(j)
+        return _job_frames[j]
+    job = _jobs[j]
+    scenes, captions, renderers, static, duration = _job_inputs(job)
+    _, scale, _, _ = _render_settings(job.get("fps", 30), job.get("draft"))
+    _job_frames[j] = make_render_frame(
+        scenes, captions, renderers, duration, static_renderers=static,
+        reuse_buffer=FRAME_RING if job.get("reuse_buffer") else False, scale=scale)
+    while len(_job_frames) > JOB_FRAMES_KEPT:
+        _job_frames.popitem(last=False)
+    return _job_frames[j]
+
+
+def _batch_segment(j, start, stop, fps, cmd, yuv):
+    returncode, stderr, dedup, _ = _encode_range(_job_render_frame(j), start, stop, fps,
+                                                 cmd, yuv)
+    return returncode, stderr, dedup
+
+
+# ── Scheduler ───────────────────────────────────────────
+def render_batch(jobs, workers=None, per_job=None, validate=True, verbose=True):
+    """
+    Render jobs (see load_jobs) on one shared pool.
+
+    workers: global limit on segments rendering at once (default: CPU count)
+    per_job: limit per job (default: workers)
+    validate: run validate_output on each finished reel
+
+    Returns one result dict per job: name, output, ok, frames, seconds,
+    valid, info, error. seconds is the job's wall time from its first
+    segment starting to its concat finishing.
+    """
+    workers = workers or os.cpu_count() or 1
+    per_job = min(per_job or workers, workers)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    results = []
+    states = []
+    for j, job in enumerate(jobs):
+        result = {"name": job["name"], "output": job["output"], "ok": False, "frames": 0,
+                  "seconds": None, "valid": None, "info": None, "error": None}
+        results.append(result)
+        try:
+            scenes, captions, _, _, duration = _job_inputs(job)
+            fps, _, pix_fmt, encode = _render_settings(job.get("fps", 30), job.get("draft"),
+                                                       job.get("reuse_buffer"),
+                                                       job.get("yuv420p"))
+            total = duration * fps
+            segments = total > 0 and scenes and _scene_segments(
+                Timeline(scenes, captions, duration), fps, total,
+                max_frames=-(-total // per_job))
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            continue
+        if not segments:
+            # No segment would ever complete for it, so the scheduler skips it
+            result["error"] = f"no frames to render ({len(scenes)} scenes, {duration}s)"
+            continue
+        tmpdir = tempfile.mkdtemp(prefix="reel_batch_")
+        paths = [os.path.join(tmpdir, f"seg_{i:03d}.mp4") for i in range(len(segments))]
+        tasks = deque(
+            (i, start, stop, _encode_cmd(paths[i], fps, pix_fmt, faststart=False,
+                                         threads=threads, **encode), pix_fmt == 'yuv420p')
+            for i, (start, stop) in enumerate(segments))
+        states.append({"j": j, "tasks": tasks, "inflight": 0, "left": len(segments),
+                       "paths": paths, "tmpdir": tmpdir, "fps": fps, "duration": duration,
+                       "size": encode["size"], "dedup": Counter(), "started": None})
+        result["frames"] = total
+
+    if verbose:
+        print(f"Batch: {len(jobs)} jobs, {sum(len(s['tasks']) for s in states)} segments "
+              f"on {workers} workers (≤{per_job} per job)")
+
+    done = queue.Queue()
+    active = list(states)
+    inflight = 0
+    t_batch = time.perf_counter()
+    try:
+        with multiprocessing.Pool(workers, initializer=_init_batch_worker,
+                                  initargs=(jobs,)) as pool:
+            while active:
+                # Fill free slots, oldest job first, so jobs finish in order
+                for state in active:
+                    while state["tasks"] and inflight < workers and state["inflight"] < per_job:
+                        i, start, stop, cmd, yuv = state["tasks"].popleft()
+                        state["started"] = state["started"] or time.perf_counter()
+                        pool.apply_async(
+                            _batch_segment, (state["j"], start, stop, state["fps"], cmd, yuv),
+                            callback=lambda r, s=state: done.put((s, r)),
+                            error_callback=lambda e, s=state: done.put((s, e)))
+                        state["inflight"] += 1
+                        inflight += 1
+
+                state, outcome = done.get()
+                state["inflight"] -= 1
+                inflight -= 1
+                result = results[state["j"]]
+                if result["error"] is None:
+                    if isinstance(outcome, BaseException):
+                        result["error"] = f"{type(outcome).__name__}: {outcome}"
+                    elif outcome[0] != 0:
+                        result["error"] = f"FFmpeg error: {outcome[1][-500:]}"
+                    else:
+                        state["dedup"].update(outcome[2])
+                state["left"] -= 1
+                if result["error"] is not None:
+                    state["left"] -= len(state["tasks"])
+                    state["tasks"].clear()
+
+                if state["left"] == 0 and state["inflight"] == 0:
+                    active.remove(state)
+                    _finish_job(jobs[state["j"]], state, result, validate, verbose)
+    finally:
+        for state in states:
+            shutil.rmtree(state["tmpdir"], ignore_errors=True)
+
+    if verbose:
+        print_summary(results, time.perf_counter() - t_batch)
+    return results
+
+
+def _finish_job(job, state, result, validate, verbose):
+    if result["error"] is None:
+        os.makedirs(os.path.dirname(job["output"]) or ".", exist_ok=True)
+        ok, stderr = _concat_segments(state["paths"], job["output"], state["tmpdir"])
+        if ok:
+            result["ok"] = True
+        else:
+            result["error"] = f"concat failed: {stderr[-500:]}"
+    result["seconds"] = round(time.perf_counter() - (state["started"] or time.perf_counter()), 2)
+    result["dedup"] = sum(state["dedup"].values())
+    if result["ok"] and validate:
+        try:
+            result["valid"], result["info"] = validate_output(
+                job["output"], state["duration"], state["fps"], state["size"])
+        except OSError as e:  # no ffprobe
+            result["info"] = {"error": str(e)}
+    shutil.rmtree(state["tmpdir"], ignore_errors=True)
+    if verbose:
+        status = "✅" if result["ok"] else "❌"
+        print(f"  {status} {result['name']} ({result['seconds']}s)", flush=True)
+
+
+def print_summary(results, wall):
+    """Per-job timing, validation and failure table."""
+    print(f"\n{'job':<28} {'frames':>7} {'sec':>8} {'fps':>7}  {'valid':<6} status")
+    for r in results:
+        fps = r["frames"] / r["seconds"] if r["ok"] and r["seconds"] else 0
+        valid = {True: "yes", False: "NO", None: "—"}[r["valid"]]
+        status = "ok" if r["ok"] else r["error"].splitlines()[0][:60]
+        print(f"{r['name'][:28]:<28} {r['frames']:>7} {r['seconds'] or 0:>8.1f} {fps:>7.1f}  "
+              f"{valid:<6} {status}")
+    ok = sum(r["ok"] for r in results)
+    frames = sum(r["frames"] for r in results if r["ok"])
+    print(f"\n{ok}/{len(results)} jobs rendered, {frames} frames in {wall:.1f}s "
+          f"({frames / wall if wall else 0:.1f} frames/s overall)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render many reels on a shared worker pool.")
+    parser.add_argument("paths", nargs="+", help="manifest/job JSON files or directories")
+    parser.add_argument("--workers", type=int, help="global concurrent segments (default: CPUs)")
+    parser.add_argument("--per-job", type=int, help="concurrent segments per job")
+    parser.add_argument("--no-validate", action="store_true", help="skip validate_output")
+    parser.add_argument("--summary", help="write per-job results as JSON here")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    results = render_batch(load_jobs(args.paths), workers=args.workers, per_job=args.per_job,
+                           validate=not args.no_validate, verbose=not args.quiet)
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(results, f, indent=2)
+    sys.exit(0 if all(r["ok"] and r["valid"] is not False for r in results) else 1)
+
+
+if __name__ == '__main__':
+    main()
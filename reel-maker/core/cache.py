@@ -0,0 +1,108 @@
+"""
+Content-addressed disk caches for reel-maker.
+
+Shared by the segment cache (core.renderer.SegmentCache) and the TTS
+synthesis cache (core.tts.TTSCache): files are stored under the hash key
+of everything that determines their content, written to a per-process
+staging path and published with an atomic rename, and evicted least
+recently used first once the cache outgrows its size limit.
+"""
+
+import os
+import time
+
+# Staging files this old belong to a process that died mid-write
+STALE_STAGING_SECONDS = 24 * 3600
+
+
+def default_cache_dir(kind):
+    """~/.cache/reel-maker/<kind>, or under $XDG_CACHE_HOME when set."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "reel-maker", kind)
+
+
+class DiskCache:
+    """
+    Files keyed by content hash in one directory.
+
+    get() looks a key up (refreshing its LRU position), staging_path() is
+    where a miss is written, commit() publishes it and discard() drops it
+    when producing it failed. evict() deletes least recently used files
+    until the cache fits max_bytes (None for no limit). Subclasses set
+    SUFFIX (the file extension) and KIND (the default directory name).
+    """
+
+    SUFFIX = ""
+    KIND = ""
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or default_cache_dir(self.KIND)
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f"{key}{self.SUFFIX}")
+
+    def get(self, key):
+        """Path of the cached file for key, or None."""
+        path = self.path(key)
+        if os.path.exists(path):
+            self.hits += 1
+            os.utime(path)
+            return path
+        self.misses += 1
+        return None
+
+    def staging_path(self, key):
+        """Where to write a missing file before commit() publishes it."""
+        return os.path.join(self.cache_dir, f"{key}.{os.getpid()}.tmp{self.SUFFIX}")
+
+    def commit(self, key):
+        os.replace(self.staging_path(key), self.path(key))
+        return self.path(key)
+
+    def discard(self, key):
+        """Delete the staging file of a write that failed or was interrupted."""
+        try:
+            os.remove(self.staging_path(key))
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        """
+        Delete least recently used files until the cache fits max_bytes, and
+        staging files left by crashed processes. Returns the remaining size.
+        """
+        entries = []
+        stale = time.time() - STALE_STAGING_SECONDS
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.SUFFIX):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+                if ".tmp." not in name:
+                    entries.append((st.st_mtime, st.st_size, path))
+                elif st.st_mtime < stale:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+        total = sum(size for _, size, _ in entries)
+        if self.max_bytes is None:
+            return total
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evicted += 1
+        return total
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evicted": self.evicted}
@@ -4,7 +4,8 @@ These are shared across all video renderers.
 """
 
 import os
-from PIL import ImageFont
+from functools import lru_cache
+from PIL import ImageDraw, ImageFont
 
 # ── Constants ───────────────────────────────────────────
 W, H = 1080, 1920
@@ -44,14 +45,40 @@ def rgba(color, alpha):
 
 
 # ── Font Helpers ────────────────────────────────────────
+FONT_CACHE_SIZE = 64
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
 def _load_font(name, size):
-    """Load a font by name, falling back to default if not found."""
+    """
+    Load a font by name, falling back to default if not found.
+    Cached per (name, size) so each face is parsed once per process.
+    """
     try:
         return ImageFont.truetype(FONT_DIR + name, size)
     except OSError:
         return ImageFont.load_default(size)
 
 
+def font_cache_info():
+    """Font cache statistics for this process: (hits, misses, maxsize, currsize)."""
+    return _load_font.cache_info()
+
+
+def clear_font_cache():
+    """Drop all cached fonts and the text rasterized with them, and reset the counters."""
+    _load_font.cache_clear()
+    scale_font.cache_clear()
+    for cache in _TEXT_CACHES:     # text masks and sprites (see text_cache)
+        cache.cache_clear()
+
+
+# Forked render workers start with an empty cache (and fresh counters)
+# instead of sharing FreeType faces opened by the parent.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=clear_font_cache)
+
+
 def font_mono(size, bold=True):
     """Monospace font (DejaVu Sans Mono)."""
     name = "DejaVuSansMono-Bold.ttf" if bold else "DejaVuSansMono.ttf"
@@ -64,6 +91,74 @@ def font_sans(size, bold=True):
     return _load_font(name, size)
 
 
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def scale_font(f, scale):
+    """Same face as f at scale × its size (for draft renders)."""
+    if scale == 1 or not hasattr(f, "font_variant"):
+        return f
+    return f.font_variant(size=max(1, round(f.size * scale)))
+
+
+# ── Text Masks ──────────────────────────────────────────
+# Fade-ins redraw the same string every frame with only the fill changing,
+# so the text helpers rasterize each (text, font) once into a coverage mask
+# and draw.bitmap() it in the requested color. The mask is drawn with
+# draw.text at a translated integer origin, so the pixels are identical.
+TEXT_CACHE_SIZE = 512
+_TEXT_CACHES = []
+
+
+def text_cache(maxsize=TEXT_CACHE_SIZE):
+    """
+    lru_cache for values built from rasterized text (masks, sprites).
+
+    Every such cache is emptied by clear_font_cache(), so none of them
+    outlives the fonts it was rasterized with or survives a fork.
+    """
+    def wrap(fn):
+        cached = lru_cache(maxsize=maxsize)(fn)
+        _TEXT_CACHES.append(cached)
+        return cached
+    return wrap
+
+
+@text_cache()
+def text_mask(text, f):
+    """
+    (bbox, coverage mask, mask offset from the text position) of text in f.
+
+    mask and offset are None for multiline text and non-FreeType fonts,
+    which are left to draw.text.
+    """
+    from PIL import Image
+
+    bbox = f.getbbox(text)
+    if "\n" in text or not isinstance(f, ImageFont.FreeTypeFont):
+        return bbox, None, None
+    l, t, r, b = bbox
+    mask = Image.new('L', (max(1, r - l), max(1, b - t)), 0)
+    ImageDraw.Draw(mask).text((-l, -t), text, font=f, fill=255)
+    return bbox, mask, (l, t)
+
+
+def text_cache_info():
+    """Text-mask cache statistics for this process: (hits, misses, maxsize, currsize)."""
+    return text_mask.cache_info()
+
+
+def _draw_text(draw, xy, text, f, fill):
+    """draw.text(xy, text, font=f, fill=fill), from the cached mask when possible."""
+    _, mask, offset = text_mask(text, f)
+    x, y = xy
+    # Wrapped draws (scaled, clipped), non-antialiased modes and subpixel
+    # positions (rasterized with a different origin) go through text()
+    if (mask is None or type(draw) is not ImageDraw.ImageDraw
+            or getattr(draw, "fontmode", "L") != "L" or x != int(x) or y != int(y)):
+        draw.text(xy, text, font=f, fill=fill)
+        return
+    draw.bitmap((int(x) + offset[0], int(y) + offset[1]), mask, fill=fill)
+
+
 # ── Drawing Primitives ──────────────────────────────────
 def draw_rounded_rect(draw, xy, radius, fill=None, outline=None, width=1):
     """Draw a rounded rectangle. xy = (x0, y0, x1, y1)."""
@@ -78,25 +173,25 @@ def draw_rounded_rect(draw, xy, radius, fill=None, outline=None, width=1):
 
 def centered_text(draw, text, cx, cy, f, fill=WHITE):
     """Draw text centered at (cx, cy)."""
-    bbox = f.getbbox(text)
+    bbox = text_mask(text, f)[0]
     tw = bbox[2] - bbox[0]
     th = bbox[3] - bbox[1]
-    draw.text((cx - tw // 2, cy - th // 2), text, font=f, fill=fill)
+    _draw_text(draw, (cx - tw // 2, cy - th // 2), text, f, fill)
 
 
 def left_text(draw, text, x, cy, f, fill=WHITE):
     """Draw text left-aligned at x, vertically centered at cy."""
-    bbox = f.getbbox(text)
+    bbox = text_mask(text, f)[0]
     th = bbox[3] - bbox[1]
-    draw.text((x, cy - th // 2), text, font=f, fill=fill)
+    _draw_text(draw, (x, cy - th // 2), text, f, fill)
 
 
 def right_text(draw, text, x, cy, f, fill=WHITE):
     """Draw text right-aligned at x, vertically centered at cy."""
-    bbox = f.getbbox(text)
+    bbox = text_mask(text, f)[0]
     tw = bbox[2] - bbox[0]
     th = bbox[3] - bbox[1]
-    draw.text((x - tw, cy - th // 2), text, font=f, fill=fill)
+    _draw_text(draw, (x - tw, cy - th // 2), text, f, fill)
 
 
 def draw_line(draw, xy, fill, width=2):
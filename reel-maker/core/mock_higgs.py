@@ -0,0 +1,163 @@
+"""
+Local stand-in for the Higgs Audio API, for exercising HiggsAPISession offline.
+
+Usage:
+    python -m core.mock_higgs --port 8765 --latency 0.3 --fail-every 4
+    HIGGS_API_BASE_URL=http://127.0.0.1:8765 HIGGS_API_KEY=test python my_video.py
+
+    # or in-process
+    from core.mock_higgs import MockHiggsServer
+    from core.tts import HiggsAPISession, generate_narration
+
+    with MockHiggsServer(fail_first=2) as server:
+        session = HiggsAPISession(base_url=server.base_url, api_key="test", backoff=0.01)
+        generate_narration(scenes, output_dir, session=session)
+        print(server.requests, server.max_active)
+
+Answers POST /v1/inference/bosonai/HiggsAudioV2.5 (JSON {"text", "output_format":
+"pcm"} with a Bearer token) with 24 kHz mono s16le PCM: a tone as long as the
+text would take to speak. Can add latency and inject 429/503 responses to
+exercise retries, and records the peak number of concurrent requests.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .tts import HiggsAPISession, _tone_pcm
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"      # keep-alive, so pooled connections are reused
+
+    def do_POST(self):
+        server = self.server.mock
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if self.path != HiggsAPISession.PATH:
+            return self._reply(404, b"not found")
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            return self._reply(401, b"missing API key")
+        try:
+            text = json.loads(body)["text"]
+        except (ValueError, KeyError):
+            return self._reply(400, b"expected JSON with 'text'")
+
+        n, fail = server._begin()
+        try:
+            if server.latency:
+                time.sleep(server.latency)
+            if fail:
+                return self._reply(fail, b"try again", {"Retry-After": str(server.retry_after)})
+            server.texts.append(text)
+            self._reply(200, _tone_pcm(text, HiggsAPISession.SAMPLE_RATE),
+                        {"Content-Type": "application/octet-stream"})
+        finally:
+            server._end()
+
+    def _reply(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.mock.verbose:
+            super().log_message(format, *args)
+
+
+class MockHiggsServer:
+    """
+    Threaded HTTP server imitating the Higgs Audio API.
+
+    latency: seconds added to every request
+    fail_first: answer the first N requests with 429
+    fail_every: answer every Nth request after those with 503
+    retry_after: the Retry-After seconds sent with those failures
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, fail_first=0, fail_every=0,
+                 retry_after=0, verbose=False):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_every = fail_every
+        self.retry_after = retry_after
+        self.verbose = verbose
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+        self.texts = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _begin(self):
+        """(request number, status to fail with or None)."""
+        with self._lock:
+            self.requests += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            n = self.requests
+        if n <= self.fail_first:
+            return n, 429
+        if self.fail_every and (n - self.fail_first) % self.fail_every == 0:
+            return n, 503
+        return n, None
+
+    def _end(self):
+        with self._lock:
+            self.active -= 1
+
+    def start(self):
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Higgs Audio API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--fail-first", type=int, default=0, help="429 the first N requests")
+    parser.add_argument("--fail-every", type=int, default=0, help="503 every Nth request")
+    parser.add_argument("--retry-after", type=float, default=0,
+                        help="Retry-After seconds sent with failures")
+    args = parser.parse_args()
+
+    server = MockHiggsServer(args.host, args.port, args.latency, args.fail_first,
+                             args.fail_every, args.retry_after, verbose=True)
+    print(f"Mock Higgs Audio API on {server.base_url} (set HIGGS_API_BASE_URL)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
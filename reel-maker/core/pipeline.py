@@ -0,0 +1,301 @@
+"""
+End-to-end reel pipeline: narration and video produced concurrently.
+
+Usage:
+    python -m core.pipeline reel.json --workers 8 --report report.json
+
+    # or in-process
+    from core.pipeline import make_reel, format_report
+    report = make_reel({"renderer": "examples/video5_context_erosion.py",
+                        "output": "out/video5.mp4",
+                        "narration": {"1": "Your agent starts sharp...", ...}})
+    print(format_report(report))
+
+A reel spec takes the core.batch job keys ("renderer", "output", "fps",
+"duration", "scenes", "captions", "draft", "yuv420p", "reuse_buffer") plus:
+
+    "narration":   {scene id: text}, or omit to use each scene's 'text';
+                   false for a silent reel
+    "voice_seed", "backend":  as for generate_narration
+    "tts_cache":   TTS cache directory (true = default location)
+    "workers", "segments", "cache_dir", "incremental":  as for render_to_mp4
+
+In Python a spec may give "scene_renderers" (and "static_renderers")
+instead of "renderer".
+
+generate_narration runs on a thread while render_to_mp4 renders and
+encodes the frames; the CPUs are split between them (partition_cpus).
+The thread starts once the render processes are forked
+(on_workers_started), never before.
+The narration reaches FFmpeg through a pipe as soon as it is ready, so
+the MP4 is still written in one pass (with segments, the final concat
+adds it). The report breaks the wall time down along the critical path:
+the pipeline that finished last, then the mux (what FFmpeg still had to
+do after both were done).
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .batch import JOB_KEYS, _job_inputs, _load_manifest
+from .profiling import Profiler
+from .renderer import render_to_mp4
+from .tts import FliteSession, detect_backend, generate_narration, get_session
+
+REEL_KEYS = JOB_KEYS | {"narration", "voice_seed", "backend", "tts_cache", "workers",
+                        "segments", "cache_dir", "incremental"}
+
+# Narration stages in pipeline order, as (report label, profiler spans)
+NARRATION_STAGES = (
+    ("tts synthesize", ("tts_generate",)),
+    ("tts stretch", ("tts_stretch",)),
+    ("tts mix", ("tts_mix", "tts_write")),
+)
+
+
+# ── Specs ───────────────────────────────────────────────
+def load_spec(path):
+    """Reel spec from a JSON file, paths made absolute (see core.batch)."""
+    specs = _load_manifest(path, REEL_KEYS)
+    if len(specs) != 1:
+        raise ValueError(f"{path}: expected one reel spec, found {len(specs)}")
+    return specs[0]
+
+
+def _reel_inputs(spec):
+    """(scenes, captions, scene_renderers, static_renderers, duration) for a spec."""
+    if "renderer" in spec:
+        return _job_inputs(spec)
+    return (spec["scenes"], [tuple(c) for c in spec["captions"]], spec["scene_renderers"],
+            spec.get("static_renderers") or {}, spec.get("duration", 57))
+
+
+def _narration_scenes(spec, scenes):
+    """generate_narration scene dicts for the scenes that have narration text."""
+    texts = spec.get("narration")
+    if texts is False:
+        return []
+    texts = {str(k): v for k, v in (texts or {}).items()}
+    narrated = []
+    for scene in scenes:
+        text = texts.get(str(scene["id"]), scene.get("text"))
+        if text:
+            narrated.append(dict(scene, text=text))
+    if not narrated and spec.get("narration") is not None:
+        raise ValueError("narration given, but no text matches a scene id")
+    return narrated
+
+
+# ── CPU Partitioning ────────────────────────────────────
+def partition_cpus(backend, cpus=None):
+    """
+    (render workers, TTS workers) for running both pipelines on cpus cores.
+
+    Flite synthesizes on the CPU, so it gets a quarter of the cores (at
+    most 4, its process limit). The other backends run on a GPU or a
+    remote API and leave the NumPy stretch and mix on one thread, so one
+    core is set aside for them. Rendering gets the rest.
+    """
+    cpus = cpus or os.cpu_count() or 1
+    tts = min(4, max(1, cpus // 4)) if backend == "flite" else 1
+    return max(1, cpus - tts), tts
+
+
+# ── Pipeline ────────────────────────────────────────────
+def make_reel(spec, verbose=True, profiler=None):
+    """
+    Render one reel with its narration, both pipelines at once.
+
+    Returns a report dict: output, ok, backend, render_workers,
+    tts_workers, the end times of each pipeline, wall_s, critical
+    ('video' or 'narration'), slack_s (how long the other pipeline
+    finished before it), critical_path [(stage, seconds), ...] summing to
+    wall_s, and sequential_s, the estimated time of running the pipelines
+    one after the other.
+    """
+    profiler = profiler or Profiler()
+    scenes, captions, renderers, static, duration = _reel_inputs(spec)
+    narrated = _narration_scenes(spec, scenes)
+
+    backend = None
+    if narrated:
+        backend = spec.get("backend") or detect_backend()
+        if backend is None:
+            raise RuntimeError("No TTS backend available (see references/tts_setup.md)")
+    render_workers, tts_workers = partition_cpus(backend)
+    render_workers = spec.get("workers") or render_workers
+
+    session = own_session = None
+    if backend == "flite":
+        session = own_session = FliteSession(workers=tts_workers)
+    elif backend:
+        session = get_session(backend)
+
+    if verbose:
+        print(f"Reel: {spec['output']}")
+        print(f"  video: {render_workers} render workers; narration: "
+              f"{f'{backend}, {tts_workers} TTS workers' if backend else 'none'}")
+
+    tmpdir = tempfile.mkdtemp(prefix="reel_pipeline_")
+    mark = len(profiler.events)
+    t0 = time.perf_counter_ns()
+    narration_end = []
+
+    def narrate():
+        try:
+            with profiler.span("narration"):
+                return generate_narration(
+                    narrated, tmpdir, duration=duration,
+                    voice_seed=spec.get("voice_seed", 42), verbose=False,
+                    profiler=profiler, session=session, cache_dir=spec.get("tts_cache"))
+        finally:
+            narration_end.append(time.perf_counter_ns())
+            if verbose:
+                print(f"  Narration ready ({(narration_end[0] - t0) / 1e9:.1f}s)", flush=True)
+
+    # Handed to render_to_mp4 now, started only once its render processes
+    # are forked, so no worker is forked while the narration thread runs
+    narration = Future() if narrated else None
+
+    def start_narration():
+        if narration is not None and narration.set_running_or_notify_cancel():
+            pool.submit(narrate).add_done_callback(lambda done: _chain(done, narration))
+
+    try:
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="narration") as pool:
+            os.makedirs(os.path.dirname(os.path.abspath(spec["output"])), exist_ok=True)
+            with profiler.span("video"):
+                ok = render_to_mp4(scenes, captions, renderers, spec["output"],
+                                   fps=spec.get("fps", 30), duration=duration,
+                                   verbose=verbose, workers=render_workers,
+                                   static_renderers=static,
+                                   reuse_buffer=spec.get("reuse_buffer", False),
+                                   incremental=spec.get("incremental", False),
+                                   segments=spec.get("segments", False),
+                                   cache_dir=spec.get("cache_dir"),
+                                   draft=spec.get("draft", False),
+                                   yuv420p=spec.get("yuv420p", False),
+                                   profiler=profiler, audio=narration,
+                                   on_workers_started=start_narration)
+            if narration is not None and (narration.running() or narration.done()):
+                narration.result()  # re-raise a failure render_to_mp4 never waited for
+        t1 = time.perf_counter_ns()
+    finally:
+        if own_session is not None:
+            own_session.close()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    report = _critical_path(profiler.events[mark:], t0, t1,
+                            narration_end[0] if narration_end else None)
+    report.update(output=spec["output"], ok=ok, backend=backend,
+                  render_workers=render_workers, tts_workers=tts_workers if backend else 0)
+    if verbose:
+        print(format_report(report))
+    return report
+
+
+def _chain(source, target):
+    """Settle target with source's outcome (both concurrent.futures.Future)."""
+    error = source.exception()
+    if error is not None:
+        target.set_exception(error)
+    else:
+        target.set_result(source.result())
+
+
+def _critical_path(events, t0, t1, narration_end):
+    """Report fields from this run's profile events (ns timestamps)."""
+    main = os.getpid()
+    windows = {}
+    for name, start, dur, pid, _, _ in events:
+        if pid == main:
+            lo, hi = windows.get(name, (start, start + dur))
+            windows[name] = (min(lo, start), max(hi, start + dur))
+
+    def s(ns):
+        return round(ns / 1e9, 3)
+
+    # The frames are done when the join starts waiting for the narration
+    join = windows.get("mux") or windows.get("concat") if narration_end else None
+    video_end = windows["audio_wait"][0] if "audio_wait" in windows else (
+        join[0] if join else t1)
+    join_s = max(0, t1 - max(video_end, narration_end)) if narration_end else 0
+    report = {"wall_s": s(t1 - t0), "video_s": s(video_end - t0),
+              "narration_s": s(narration_end - t0) if narration_end else None,
+              "mux_s": s(join_s)}
+
+    path = []
+    if narration_end and narration_end > video_end:
+        report["critical"], report["slack_s"] = "narration", s(narration_end - video_end)
+        prev = t0
+        for label, names in NARRATION_STAGES:
+            ends = [windows[n][1] for n in names if n in windows]
+            if ends:
+                end = min(max(ends), narration_end)
+                path.append((label, s(end - prev)))
+                prev = end
+        if narration_end - prev > 10_000_000:     # cleanup after the mix, if noticeable
+            path.append(("narration (other)", s(narration_end - prev)))
+    else:
+        report["critical"] = "video"
+        report["slack_s"] = s(video_end - narration_end) if narration_end else None
+        path.append(("render + encode", s(video_end - t0)))
+    if narration_end:
+        path.append(("mux", s(join_s)))
+    report["critical_path"] = path
+    report["sequential_s"] = s(video_end - t0 + (narration_end - t0 if narration_end else 0)
+                               + join_s)
+    return report
+
+
+def format_report(report):
+    """Critical-path breakdown as text."""
+    lines = [f"\nCritical path ({report['critical']}):"]
+    for stage, seconds in report["critical_path"]:
+        pct = seconds / report["wall_s"] * 100 if report["wall_s"] else 0
+        lines.append(f"  {stage:<20} {seconds:>8.2f}s {pct:>6.1f}%")
+    lines.append(f"  {'wall':<20} {report['wall_s']:>8.2f}s")
+    narration = report["narration_s"]
+    lines.append(f"video ready {report['video_s']:.2f}s, narration ready "
+                 + (f"{narration:.2f}s" if narration is not None else "—")
+                 + (f", slack {report['slack_s']:.2f}s" if report["slack_s"] is not None else ""))
+    if narration is not None and report["wall_s"]:
+        lines.append(f"sequential estimate {report['sequential_s']:.2f}s "
+                     f"({report['sequential_s'] / report['wall_s']:.2f}× the wall time)")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render one reel with narration, "
+                                                 "audio and video pipelines in parallel.")
+    parser.add_argument("spec", help="reel spec JSON (core.batch job keys + narration)")
+    parser.add_argument("--workers", type=int, help="render workers (default: partitioned)")
+    parser.add_argument("--backend", help="TTS backend (default: auto-detect)")
+    parser.add_argument("--report", help="write the timing report as JSON here")
+    parser.add_argument("--trace", help="write a Chrome trace of both pipelines here")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    spec = load_spec(args.spec)
+    if args.workers:
+        spec["workers"] = args.workers
+    if args.backend:
+        spec["backend"] = args.backend
+    profiler = Profiler()
+    report = make_reel(spec, verbose=not args.quiet, profiler=profiler)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.trace:
+        profiler.write_chrome_trace(args.trace)
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Opt-in stage profiler for reel-maker.
+
+Usage:
+    from core.profiling import Profiler
+
+    prof = Profiler()
+    render_to_mp4(scenes, captions, scene_renderers, "out.mp4", profiler=prof)
+    generate_narration(scenes, output_dir, profiler=prof)
+
+    print(prof.summary())                      # aggregated table
+    prof.write_chrome_trace("trace.json")      # chrome://tracing or ui.perfetto.dev
+
+Stages are timed with `with profiler.span(name, scene=id):`. Functions take
+profiler=None and fall back to NULL_PROFILER, whose span() returns one
+shared no-op context manager, so disabled instrumentation costs a method
+call per stage and records nothing.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+
+class _Span:
+    __slots__ = ("_events", "_name", "_args", "_start")
+
+    def __init__(self, events, name, args):
+        self._events = events
+        self._name = name
+        self._args = args
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        # list.append is atomic, so writer/reader threads can record too
+        self._events.append((self._name, self._start, end - self._start, os.getpid(),
+                             threading.get_native_id(), self._args))
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Profiler:
+    """
+    Records (name, start_ns, duration_ns, pid, tid, args) per span.
+    Timestamps come from the monotonic perf counter, which is shared by
+    all processes on the machine, so worker events line up in one trace.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.events = []
+
+    def span(self, name, **args):
+        """Context manager timing one stage; args (e.g. scene=3) label it."""
+        return _Span(self.events, name, args)
+
+    def child(self):
+        """Empty profiler for a worker process; merge() its drain() back."""
+        return Profiler()
+
+    def drain(self):
+        """Remove and return all recorded events."""
+        events, self.events = self.events, []
+        return events
+
+    def merge(self, events):
+        """Add events recorded elsewhere (e.g. by a worker process)."""
+        self.events.extend(events)
+
+    # ── Reports ──
+    def stats(self):
+        """{stage label: {'count', 'total_ms', 'mean_ms', 'max_ms'}}, slowest first."""
+        groups = defaultdict(list)
+        for name, _, dur, _, _, args in self.events:
+            label = f"{name} [scene {args['scene']}]" if "scene" in args else name
+            groups[label].append(dur / 1e6)
+        stats = {
+            label: {"count": len(d), "total_ms": sum(d), "mean_ms": sum(d) / len(d),
+                    "max_ms": max(d)}
+            for label, d in groups.items()
+        }
+        return dict(sorted(stats.items(), key=lambda kv: -kv[1]["total_ms"]))
+
+    def summary(self):
+        """Aggregated per-stage table as text."""
+        if not self.events:
+            return "(no profile events)"
+        start = min(e[1] for e in self.events)
+        wall_ms = (max(e[1] + e[2] for e in self.events) - start) / 1e6
+        lines = [f"{'stage':<32} {'count':>7} {'total ms':>11} {'mean ms':>9} "
+                 f"{'max ms':>9} {'% wall':>7}"]
+        for label, s in self.stats().items():
+            lines.append(f"{label:<32} {s['count']:>7} {s['total_ms']:>11.1f} "
+                         f"{s['mean_ms']:>9.3f} {s['max_ms']:>9.2f} "
+                         f"{s['total_ms'] / wall_ms * 100 if wall_ms else 0:>6.1f}%")
+        lines.append(f"wall: {wall_ms:.1f} ms (nested stages overlap; totals may exceed it)")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """Trace Event Format dict (complete 'X' events, µs timestamps)."""
+        start = min((e[1] for e in self.events), default=0)
+        trace = [
+            {"name": name, "ph": "X", "ts": (ts - start) / 1000, "dur": dur / 1000,
+             "pid": pid, "tid": tid, "args": args}
+            for name, ts, dur, pid, tid, args in self.events
+        ]
+        main = os.getpid()
+        trace += [
+            {"name": "process_name", "ph": "M", "pid": pid,
+             "args": {"name": "reel-maker" if pid == main else f"worker {pid}"}}
+            for pid in sorted({e[3] for e in self.events})
+        ]
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path):
+        """Write the trace as JSON for chrome://tracing or ui.perfetto.dev."""
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+
+class _NullProfiler:
+    """Stand-in used when profiling is off: every span is the same no-op."""
+
+    enabled = False
+    events = ()
+
+    def span(self, name, **args):
+        return _NULL_SPAN
+
+    def child(self):
+        return self
+
+    def drain(self):
+        return []
+
+    def merge(self, events):
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
@@ -3,15 +3,885 @@ FFmpeg pipe renderer for reel-maker.
 Renders all frames and pipes to FFmpeg for H.264 MP4 output.
 """
 
+import contextlib
 import subprocess
 import sys
 import os
+import re
+import json
+import types
+import hashlib
+import functools
+import shutil
+import tempfile
+import itertools
+import multiprocessing
+import queue
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future
+from .cache import DiskCache
 from .drawing import W, H
-from .scene_base import make_render_frame
+from .scene_base import make_render_frame, scaled_size, Timeline
+from .profiling import NULL_PROFILER
+
+
+# ── YUV Conversion ──────────────────────────────────────
+# BT.601 limited range in swscale's 15-bit fixed point (rgb2yuv table)
+_YUV_SHIFT = 15
+_KR, _KB = 0.299, 0.114
+_KG = 1 - _KR - _KB
+
+
+def _fixed(coeffs, scale):
+    return [int(round(c * scale / 255 * (1 << _YUV_SHIFT))) for c in coeffs]
+
+
+_Y_COEFFS = _fixed((_KR, _KG, _KB), 219)
+_U_COEFFS = _fixed((-0.5 * _KR / (1 - _KB), -0.5 * _KG / (1 - _KB), 0.5), 224)
+_V_COEFFS = _fixed((0.5, -0.5 * _KG / (1 - _KR), -0.5 * _KB / (1 - _KR)), 224)
+
+
+def rgb_to_yuv420p(data, size, channels=3):
+    """
+    Convert one packed RGB frame (rgb24, or rgb0 with channels=4) to planar
+    yuv420p bytes (Y, then U and V at half resolution): half the size.
+
+    Uses the BT.601 limited-range matrix FFmpeg's swscale applies for
+    rgb24 → yuv420p, with the same fixed-point rounding, so luma is within
+    ±1 of FFmpeg's. Chroma is not: each chroma sample here is the plain
+    average of its 2×2 block, while swscale filters chroma vertically
+    with its (bicubic) scaler, so at hard colour edges chroma differs by
+    up to ~15 levels. Requires NumPy; size must be even.
+    """
+    import numpy as np
+
+    w, h = size
+    px = np.frombuffer(data, np.uint8).reshape(h, w, channels)
+    r, g, b = (px[..., i].astype(np.int32) for i in range(3))
+
+    out = np.empty(w * h * 3 // 2, np.uint8)
+    ry, gy, by = _Y_COEFFS
+    y = ry * r + gy * g + by * b
+    y += (16 << _YUV_SHIFT) + (1 << (_YUV_SHIFT - 1))
+    out[:w * h] = (y >> _YUV_SHIFT).ravel()
+
+    # Chroma from 2×2 sums: 2 extra bits of shift average the four pixels
+    shift = _YUV_SHIFT + 2
+    r, g, b = (c[0::2, 0::2] + c[1::2, 0::2] + c[0::2, 1::2] + c[1::2, 1::2]
+               for c in (r, g, b))
+    offset = (128 << shift) + (1 << (shift - 1))
+    quarter = w * h // 4
+    for i, (cr, cg, cb) in enumerate((_U_COEFFS, _V_COEFFS)):
+        c = cr * r + cg * g + cb * b
+        c += offset
+        start = w * h + i * quarter
+        out[start:start + quarter] = (c >> shift).ravel()
+    return out
+
+
+# ── Frame Generation ────────────────────────────────────
+def _render_frames(render_frame, start, stop, fps, compare_bytes=False, yuv=False):
+    """
+    Yield raw frame data for frames [start, stop), or None for a frame
+    identical to the one before it. Data is bytes, or with a reuse_buffer
+    render_frame a memoryview that is only valid until the next frame.
+    With yuv, frames are converted to yuv420p arrays (see rgb_to_yuv420p).
+
+    Frames of a frozen scene whose frame_key matches the previous frame are
+    not rendered at all. With compare_bytes, rendered frames are also
+    compared byte-for-byte, so repeats need not be shipped between processes.
+    """
+    profiler = render_frame.profiler
+    prev_key = prev = None
+    for n in range(start, stop):
+        t = n / fps
+        key = render_frame.frame_key(t)
+        if key is not None and key == prev_key:
+            yield None
+            continue
+
+        img = render_frame(t)
+        sid = render_frame.timeline.scene_at(t)["id"] if profiler.enabled else None
+        if render_frame.buffer is not None:
+            data = render_frame.buffer
+        else:
+            with profiler.span("tobytes", scene=sid):
+                data = img.tobytes()
+        if yuv:
+            with profiler.span("yuv420p", scene=sid):
+                data = rgb_to_yuv420p(data, render_frame.size,
+                                      3 if render_frame.buffer is None else 4)
+        prev_key = key
+        if compare_bytes:
+            data = bytes(data)
+            if data == prev:
+                yield None
+                continue
+            prev = data
+        yield data
+
+
+# Output encoding (locked, see export_specs.md)
+_X264_ARGS = ['-c:v', 'libx264', '-preset', 'medium', '-crf', '18', '-pix_fmt', 'yuv420p']
+
+# Draft renders: default scale, frame-rate cap and fast encoder settings
+DRAFT_SCALE = 0.5
+DRAFT_FPS = 15
+_DRAFT_X264_ARGS = ['-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '28',
+                    '-pix_fmt', 'yuv420p']
+
+
+def _encode_cmd(output_path, fps, pix_fmt='rgb24', faststart=True, threads=None,
+                size=(W, H), x264_args=_X264_ARGS, audio=None):
+    """
+    FFmpeg command reading raw frames from stdin and encoding H.264 (see
+    export_specs.md). With audio (a _NarrationInput) the narration is a
+    second input, encoded as AAC into the same file.
+    """
+    cmd = [
+        'ffmpeg', '-y',
+        '-f', 'rawvideo',
+        '-vcodec', 'rawvideo',
+        '-pix_fmt', pix_fmt,
+        '-s', f'{size[0]}x{size[1]}',
+        '-r', str(fps),
+        '-i', '-',
+    ]
+    if audio is not None:
+        cmd += [*audio.args, '-map', '0:v', '-map', '1:a']
+    cmd += x264_args
+    if threads:
+        cmd += ['-threads', str(threads)]
+    if faststart:
+        cmd += ['-movflags', '+faststart']
+    if audio is not None:
+        return cmd + [*_AAC_ARGS, output_path]
+    return cmd + ['-an', output_path]
+
+
+# ── Narration Input ─────────────────────────────────────
+AUDIO_RATE = 44100
+_AAC_ARGS = ['-c:a', 'aac', '-b:a', '192k', '-ar', str(AUDIO_RATE), '-shortest']
+
+# Audio pipe ends that forked render workers must not keep open: a stray
+# copy of the write end would keep FFmpeg from ever seeing end of input
+_pipe_fds = set()
+_pipe_fds_lock = threading.Lock()
+
+
+def _close_pipe_fd(fd):
+    with _pipe_fds_lock:
+        _pipe_fds.discard(fd)
+        os.close(fd)
+
+
+def _after_fork_in_child():
+    for fd in _pipe_fds:
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+    _pipe_fds.clear()
+    _pipe_fds_lock.release()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_pipe_fds_lock.acquire,
+                        after_in_parent=_pipe_fds_lock.release,
+                        after_in_child=_after_fork_in_child)
+
+
+class _NarrationInput:
+    """
+    Narration as an extra FFmpeg input: a WAV path is read directly; a
+    sample buffer (float mono samples at AUDIO_RATE, or (samples, rate)) is
+    streamed as s16le through an extra pipe while the frames go to stdin,
+    so it never touches the disk. Where pipes cannot be passed to FFmpeg
+    (Windows) the buffer is written to a temporary WAV instead. Either may
+    arrive as a Future: prepare() waits for it, or with wait=False opens
+    the pipe at once and the feeder thread waits, so FFmpeg encodes the
+    frames meanwhile and picks the narration up when it lands.
+    """
+
+    def __init__(self, audio):
+        self.source = audio
+        self.args = None
+        self.pass_fds = ()
+        self._pcm = None
+        self._write_fd = None
+        self._feeder = None
+        self._tmpdir = None
+
+    @property
+    def ready(self):
+        """False while the narration is a Future still being produced."""
+        return not isinstance(self.source, Future) or self.source.done()
+
+    @property
+    def late(self):
+        """True when prepare(wait=False) would pipe a still-running Future."""
+        return not self.ready and os.name == 'posix'
+
+    def prepare(self, wait=True):
+        """Resolve the narration and set up args (and the pipe). Idempotent."""
+        if self.args is not None:
+            return self
+        if not wait and self.late:
+            self._open_pipe(AUDIO_RATE)   # _late_pcm converts to this rate
+            return self
+        audio = self.source.result() if isinstance(self.source, Future) else self.source
+        if isinstance(audio, (str, os.PathLike)):
+            self.args = ['-i', os.fspath(audio)]
+            return self
+
+        samples, rate = audio if isinstance(audio, tuple) else (audio, AUDIO_RATE)
+        from . import audio as audio_engine
+        if os.name != 'posix':
+            self._tmpdir = tempfile.mkdtemp(prefix="reel_audio_")
+            path = audio_engine.write_wav(os.path.join(self._tmpdir, "narration.wav"),
+                                          samples, rate)
+            self.args = ['-i', path]
+            return self
+        self._pcm = audio_engine.to_pcm16(samples)
+        self._open_pipe(rate)
+        return self
+
+    def _open_pipe(self, rate):
+        with _pipe_fds_lock:
+            read_fd, self._write_fd = os.pipe()
+            _pipe_fds.update((read_fd, self._write_fd))
+        self.pass_fds = (read_fd,)
+        self.args = ['-f', 's16le', '-ar', str(rate), '-ac', '1', '-i', f'pipe:{read_fd}']
+
+    def _late_pcm(self):
+        """The resolved Future's narration as mono s16le at AUDIO_RATE."""
+        from . import audio as audio_engine
+
+        audio = self.source.result()
+        if isinstance(audio, (str, os.PathLike)):
+            samples, rate = audio_engine.read_wav(os.fspath(audio))
+        else:
+            samples, rate = audio if isinstance(audio, tuple) else (audio, AUDIO_RATE)
+        return audio_engine.to_pcm16(audio_engine.resample(samples, rate, AUDIO_RATE))
+
+    def start(self):
+        """Once FFmpeg holds the read end: feed the samples on a thread."""
+        for fd in self.pass_fds:
+            _close_pipe_fd(fd)
+        self.pass_fds = ()
+        if self._write_fd is None:
+            return
+
+        def feed(fd, pcm):
+            try:
+                if pcm is None:
+                    pcm = self._late_pcm()   # blocks this thread only
+                with open(fd, 'wb', closefd=False) as pipe:
+                    pipe.write(pcm)
+            except OSError:
+                pass  # FFmpeg exited; its stderr says why
+            except Exception:
+                pass  # the narration failed; its Future holds the error
+            finally:
+                _close_pipe_fd(fd)
+
+        self._feeder = threading.Thread(target=feed, args=(self._write_fd, self._pcm),
+                                        daemon=True)
+        self._write_fd = None
+        self._feeder.start()
+
+    def wait(self):
+        """Block until all the narration has been fed to FFmpeg."""
+        if self._feeder is not None:
+            self._feeder.join()
+
+    def close(self):
+        if self._feeder is not None:
+            self._feeder.join()
+        for fd in (*self.pass_fds, *([self._write_fd] if self._write_fd is not None else [])):
+            _close_pipe_fd(fd)
+        self.pass_fds = ()
+        self._write_fd = None
+        if self._tmpdir:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+
+# ── Encoder Pipeline ────────────────────────────────────
+ENCODE_QUEUE_FRAMES = 8  # frames buffered between rendering and the FFmpeg pipe
+
+# reuse_buffer frames handed to _encode_frames without a copy come from a ring
+# this large: one being written, ENCODE_QUEUE_FRAMES queued, one being drawn
+FRAME_RING = ENCODE_QUEUE_FRAMES + 2
+
+_FFMPEG_PROGRESS = re.compile(r'frame=\s*(\d+)\s+fps=')
+
+
+def _drain_stderr(stream, log, on_progress=None):
+    """
+    Read FFmpeg's stderr as it arrives, so a chatty encoder can never fill
+    the pipe and stall. Progress lines ('frame= N fps= ...') are passed to
+    on_progress(N); everything else is appended to log.
+    """
+    def handle(line):
+        text = line.decode(errors='replace')
+        match = _FFMPEG_PROGRESS.search(text)
+        if match:
+            if on_progress:
+                on_progress(int(match.group(1)))
+        elif text.strip():
+            log.append(text)
+
+    pending = b''
+    for chunk in iter(lambda: stream.read1(65536), b''):
+        *lines, pending = re.split(rb'[\r\n]', pending + chunk)
+        for line in lines:
+            handle(line)
+    handle(pending)
+
+
+def _encode_frames(cmd, frames, timeline, fps, start=0, on_progress=None,
+                   queue_frames=ENCODE_QUEUE_FRAMES, profiler=NULL_PROFILER, audio=None):
+    """
+    Encode frames with an FFmpeg process run as its own pipeline stage.
+
+    Frames are handed through a bounded queue to a writer thread that owns
+    the blocking stdin writes, while a reader thread drains stderr. Frame
+    N+1 is rendered while frame N is written and encoded, and at most
+    queue_frames frames are held in between. None repeats the previous
+    frame. memoryview frames (reuse_buffer) are queued without a copy, so
+    they must come from a ring of at least queue_frames + 2 buffers
+    (FRAME_RING): a buffer is then redrawn only after queue_frames + 1
+    later frames were queued, by which time the writer is done with it.
+    on_progress(frames_encoded) is called as FFmpeg reports progress.
+    profiler records 'pipe_write' (writer thread) and 'queue_wait' (time
+    the render side is blocked on a full queue) spans. audio is the
+    _NarrationInput cmd was built with; its samples are fed alongside.
+    Returns (returncode, stderr, Counter of repeated frames per scene id).
+    """
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE,
+                            pass_fds=audio.pass_fds if audio is not None else ())
+    if audio is not None:
+        audio.start()
+    log = []
+    pending = queue.Queue(maxsize=queue_frames)
+    broken = threading.Event()
+
+    def write():
+        while True:
+            data = pending.get()
+            if data is None:
+                break
+            if broken.is_set():
+                continue  # keep draining so the render side never blocks
+            try:
+                with profiler.span("pipe_write"):
+                    proc.stdin.write(data)
+            except OSError:
+                broken.set()  # FFmpeg exited; its stderr says why
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+
+    writer = threading.Thread(target=write, daemon=True)
+    reader = threading.Thread(target=_drain_stderr, args=(proc.stderr, log, on_progress),
+                              daemon=True)
+    writer.start()
+    reader.start()
+
+    dedup = Counter()
+    prev = None
+    try:
+        for frame_num, data in enumerate(frames, start):
+            if broken.is_set():
+                break
+            if data is None:
+                data = prev
+                dedup[timeline.scene_at(frame_num / fps)["id"]] += 1
+            with profiler.span("queue_wait"):
+                pending.put(data)
+            prev = data
+    finally:
+        pending.put(None)
+        writer.join()
+        if audio is not None:
+            # The frames are all written; a late narration may still be coming
+            with profiler.span("audio_wait"):
+                audio.wait()
+        reader.join()
+        proc.wait()
+    return proc.returncode, "\n".join(log), dedup
+
+
+# ── Parallel Frame Rendering ────────────────────────────
+_worker_render_frame = None
+
+
+def _init_worker(scenes, captions, scene_renderers, duration, options):
+    """Pool initializer: build one render_frame per worker process."""
+    global _worker_render_frame
+    profiler = (options.get("profiler") or NULL_PROFILER).child()
+    _worker_render_frame = make_render_frame(scenes, captions, scene_renderers, duration,
+                                             **dict(options, profiler=profiler))
+
+
+def _render_chunk(start, stop, fps, yuv=False):
+    """
+    Render frames [start, stop) in a worker. Returns a list of raw frame bytes,
+    with None in place of frames identical to the previous one, and the
+    profile events recorded meanwhile.
+    """
+    frames = list(_render_frames(_worker_render_frame, start, stop, fps,
+                                 compare_bytes=True, yuv=yuv))
+    return frames, _worker_render_frame.profiler.drain()
+
+
+def _render_pool(workers, scenes, captions, scene_renderers, duration, options):
+    """
+    Process pool of render workers (see _init_worker). Create it before
+    starting any thread: forking a process while other threads hold locks
+    (stdio, logging, HTTP pools, BLAS) can deadlock the forked workers.
+    """
+    return multiprocessing.Pool(workers, initializer=_init_worker,
+                                initargs=(scenes, captions, scene_renderers, duration,
+                                          options))
+
+
+def _render_parallel(pool, options, fps, total_frames, workers, max_inflight, yuv=False):
+    """
+    Yield raw frames in order (None for repeats), rendered across a
+    _render_pool.
+
+    Frames are dispatched in small chunks; at most max_inflight frames are
+    rendered ahead of the consumer, so memory stays bounded at roughly
+    max_inflight × W × H × 3 bytes.
+    """
+    chunk = max(1, max_inflight // (2 * workers))
+    chunks = ((s, min(s + chunk, total_frames)) for s in range(0, total_frames, chunk))
+
+    pending = deque(
+        pool.apply_async(_render_chunk, (start, stop, fps, yuv))
+        for start, stop in itertools.islice(chunks, max(1, max_inflight // chunk))
+    )
+    profiler = options.get("profiler") or NULL_PROFILER
+    while pending:
+        frames, events = pending.popleft().get()
+        profiler.merge(events)
+        nxt = next(chunks, None)
+        if nxt is not None:
+            pending.append(pool.apply_async(_render_chunk, (*nxt, fps, yuv)))
+        yield from frames
+
+
+def _render_piped(scenes, captions, scene_renderers, duration, options,
+                  fps, total_frames, workers, max_inflight, pix_fmt, output_path, verbose,
+                  encode, audio=None, started=None):
+    """
+    Render frames (in-process or on a pool) into a single FFmpeg pipe.
+    encode holds extra _encode_cmd arguments; audio is muxed in the same
+    pass. started() is called once the pool exists, before the encoder
+    threads start. Returns (ok, stderr, dedup Counter).
+    """
+    yuv = pix_fmt == 'yuv420p'
+    profiler = options.get("profiler") or NULL_PROFILER
+    last_second = [-1]
+
+    def on_progress(frames_encoded):
+        t = frames_encoded // fps
+        if verbose and t > last_second[0]:
+            last_second[0] = t
+            pct = frames_encoded / total_frames * 100
+            print(f"  {pct:5.1f}% — {t}s / {duration}s", flush=True)
+
+    with contextlib.ExitStack() as stack:
+        if workers > 1:
+            pool = stack.enter_context(_render_pool(workers, scenes, captions, scene_renderers,
+                                                    duration, options))
+            frames = _render_parallel(pool, options, fps, total_frames, workers,
+                                      max_inflight or 4 * workers, yuv)
+        else:
+            render_frame = make_render_frame(scenes, captions, scene_renderers, duration,
+                                             **options)
+            frames = _render_frames(render_frame, 0, total_frames, fps, yuv=yuv)
+        if started is not None:
+            started()
+
+        returncode, stderr, dedup = _encode_frames(
+            _encode_cmd(output_path, fps, pix_fmt, audio=audio, **encode), frames,
+            Timeline(scenes, captions, duration), fps, on_progress=on_progress,
+            profiler=profiler, audio=audio)
+    return returncode == 0, stderr, dedup
+
+
+# ── Segment-Parallel Encoding ───────────────────────────
+def _scene_segments(timeline, fps, total_frames, max_frames=None):
+    """Frame ranges [start, stop) that never cross a scene boundary, each ≤ max_frames."""
+    segments = []
+    start = 0
+    for n in range(1, total_frames + 1):
+        if (n == total_frames
+                or timeline.scene_at(n / fps) is not timeline.scene_at(start / fps)
+                or (max_frames and n - start >= max_frames)):
+            segments.append((start, n))
+            start = n
+    return segments
+
+
+def _encode_segment(start, stop, fps, cmd, yuv=False):
+    """
+    Render frames [start, stop) in a worker and encode them with a dedicated
+    FFmpeg process. Returns (returncode, stderr, {scene_id: repeated frames},
+    profile events).
+    """
+    return _encode_range(_worker_render_frame, start, stop, fps, cmd, yuv)
+
+
+def _encode_range(render_frame, start, stop, fps, cmd, yuv=False):
+    """_encode_segment for an explicit render_frame."""
+    profiler = render_frame.profiler
+    with profiler.span("segment", start=start, stop=stop):
+        returncode, stderr, dedup = _encode_frames(
+            cmd, _render_frames(render_frame, start, stop, fps, yuv=yuv),
+            render_frame.timeline, fps, start, profiler=profiler)
+    return returncode, stderr, dict(dedup), profiler.drain()
+
+
+# ── Segment Cache ───────────────────────────────────────
+SEGMENT_CACHE_MAX_BYTES = 4 * 1024 * 1024 * 1024
+# Longest cached segment. Fixed, unlike the uncached split into `workers`
+# slices, so the same frames get the same keys whatever the worker count.
+CACHE_SEGMENT_SECONDS = 4
+
+
+class SegmentCache(DiskCache):
+    """
+    Content-addressed disk cache of encoded segments.
+
+    A segment's key hashes everything that decides its pixels and encoding:
+    its scene dict, the renderer (and static renderer) code with the
+    constants and helpers it references, the captions on screen during it,
+    the progress-bar timeline, the core drawing code, the frame range and
+    the encoder settings. Unchanged scenes are reused on re-render. The
+    least recently used segments are evicted once the cache exceeds
+    max_bytes (None for no limit).
+    """
+
+    SUFFIX = ".mp4"
+    KIND = "segments"
+
+    def __init__(self, cache_dir=None, max_bytes=SEGMENT_CACHE_MAX_BYTES):
+        super().__init__(cache_dir, max_bytes)
+
+
+_core_digest = None
+
+
+def _core_fingerprint():
+    """Digest of the core drawing sources, so core changes invalidate the cache."""
+    global _core_digest
+    if _core_digest is None:
+        h = hashlib.sha256()
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in ("drawing.py", "scene_base.py"):
+            with open(os.path.join(here, name), 'rb') as f:
+                h.update(f.read())
+        _core_digest = h.hexdigest()
+    return _core_digest
+
+
+class _Uncacheable(Exception):
+    """A renderer depends on a value the segment key cannot fingerprint."""
+
+
+_PLAIN = (bool, int, float, complex, str, bytes, type(None))
+
+
+def _feed_value(h, value, seen):
+    """
+    Hash a value a renderer depends on by its content, never by identity.
+
+    Plain values, containers, NumPy arrays, PIL images and fonts, modules,
+    functions (see _feed_callable), partials, bound methods and instances
+    of pure-Python classes (by their attributes, e.g. Animation) are
+    fingerprinted. Anything else raises _Uncacheable rather than being
+    left out of the key.
+    """
+    if isinstance(value, _PLAIN):
+        h.update(f"{type(value).__name__}:{value!r};".encode())
+        return
+    if id(value) in seen:
+        h.update(b"<seen>")
+        return
+    seen[id(value)] = value     # keeps value alive, so its id is not reused
+
+    from PIL import Image, ImageFont
+
+    kind = type(value)
+    h.update(f"{kind.__module__}.{kind.__qualname__}(".encode())
+    if isinstance(value, (tuple, list)):
+        for item in value:
+            _feed_value(h, item, seen)
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            _feed_value(h, k, seen)
+            _feed_value(h, v, seen)
+    elif isinstance(value, (set, frozenset)):
+        # Sorted by content: set order varies between runs with str hashing
+        parts = []
+        for item in value:
+            sub = hashlib.sha256()
+            _feed_value(sub, item, seen)
+            parts.append(sub.digest())
+        h.update(b"".join(sorted(parts)))
+    elif hasattr(value, "dtype") and hasattr(value, "tobytes"):      # NumPy
+        h.update(f"{value.dtype}{getattr(value, 'shape', ())}".encode())
+        h.update(hashlib.sha256(value.tobytes()).digest())
+    elif isinstance(value, Image.Image):
+        h.update(f"{value.mode}{value.size}".encode())
+        h.update(hashlib.sha256(value.tobytes()).digest())
+    elif isinstance(value, ImageFont.FreeTypeFont):
+        source = value.path if isinstance(value.path, (str, bytes)) else value.getname()
+        _feed_value(h, (source, value.size, value.index, value.encoding,
+                        int(value.layout_engine)), seen)
+    elif isinstance(value, ImageFont.ImageFont):
+        pass                        # Pillow's built-in bitmap font
+    elif isinstance(value, types.ModuleType):
+        h.update(value.__name__.encode())
+    elif isinstance(value, type):
+        _feed_class(h, value, seen)
+    elif isinstance(value, functools.partial):
+        _feed_value(h, (value.func, value.args, value.keywords), seen)
+    elif isinstance(value, types.MethodType):
+        _feed_value(h, (value.__func__, value.__self__), seen)
+    elif callable(value) and (hasattr(value, "__code__") or hasattr(value, "__wrapped__")):
+        _feed_callable(h, value, seen)
+    elif callable(value) and not hasattr(value, "__dict__"):
+        # Builtins and ufuncs: library code, fixed for a given install
+        h.update(f"{getattr(value, '__module__', None)}."
+                 f"{getattr(value, '__qualname__', getattr(value, '__name__', ''))}".encode())
+    elif hasattr(value, "__dict__") and not hasattr(kind, "__slots__"):
+        # Instances of pure-Python classes: their class code and attributes
+        _feed_class(h, kind, seen)
+        _feed_value(h, vars(value), seen)
+    else:
+        raise _Uncacheable(f"{kind.__module__}.{kind.__qualname__}")
+    h.update(b")")
+
+
+def _feed_class(h, cls, seen):
+    """Hash a class by name, plus the code and constants it defines itself."""
+    h.update(f"{cls.__module__}.{cls.__qualname__}".encode())
+    if cls.__module__ == "builtins":
+        return
+    for name, attr in vars(cls).items():
+        if isinstance(attr, (staticmethod, classmethod)):
+            attr = attr.__func__
+        elif isinstance(attr, property):
+            attr = (attr.fget, attr.fset)
+        if isinstance(attr, (types.FunctionType, tuple) + _PLAIN):
+            h.update(name.encode())
+            _feed_value(h, attr, seen)
+
+
+def _feed_callable(h, fn, seen):
+    """Hash fn's bytecode and constants, plus module-level values and helpers it uses."""
+    # lru_cache and functools.wraps decorated helpers: hash the function they
+    # wrap, then the wrapper itself (an lru_cache has no code of its own)
+    wrapped = getattr(fn, "__wrapped__", None)
+    if callable(wrapped):
+        _feed_value(h, wrapped, seen)
+    code = getattr(fn, "__code__", None)
+    if code is None:
+        h.update(getattr(fn, "__qualname__", type(fn).__qualname__).encode())
+        return
+    if id(code) in seen:
+        return
+    seen[id(code)] = code
+
+    names = set()
+
+    def feed_code(c):
+        h.update(c.co_code)
+        names.update(c.co_names)
+        for const in c.co_consts:
+            if isinstance(const, types.CodeType):
+                feed_code(const)
+            else:
+                h.update(repr(const).encode())
+
+    feed_code(code)
+    _feed_value(h, (fn.__defaults__, fn.__kwdefaults__), seen)
+
+    for name in sorted(names):
+        if name in fn.__globals__:
+            h.update(name.encode())
+            _feed_value(h, fn.__globals__[name], seen)
+    for cell in fn.__closure__ or ():
+        try:
+            _feed_value(h, cell.cell_contents, seen)
+        except ValueError:          # empty cell
+            h.update(b"<empty>")
+
+
+def _segment_key(scenes, captions, scene_renderers, options, duration,
+                 fps, start, stop, scene, encode):
+    """
+    Cache key for frames [start, stop), all of which belong to scene, or
+    None when the renderers use a value that cannot be fingerprinted.
+    """
+    h = hashlib.sha256()
+    t0, t1 = start / fps, stop / fps
+    spec = {
+        "scene": scene,
+        "timeline": [(s["id"], s["start"], s["end"], s["label"], s["color"]) for s in scenes],
+        "captions": [c for c in captions if c[0] < t1 and c[1] > t0],
+        "frames": (start, stop, fps, duration, options.get("scale", 1)),
+        "encode": encode,
+        "core": _core_fingerprint(),
+    }
+    h.update(json.dumps(spec, sort_keys=True, default=repr).encode())
+    seen = {}
+    try:
+        _feed_value(h, scene_renderers.get(scene["id"]), seen)
+        _feed_value(h, (options.get("static_renderers") or {}).get(scene["id"]), seen)
+    except _Uncacheable:
+        return None
+    return h.hexdigest()
+
+
+def _render_segmented(scenes, captions, scene_renderers, duration, options,
+                      fps, total_frames, workers, pix_fmt, output_path, verbose,
+                      encode, cache=None, audio=None, started=None):
+    """
+    Render and encode scene-aligned segments in parallel, then join them
+    with FFmpeg's concat demuxer (stream copy, no re-encode), muxing audio
+    in the same pass. With a SegmentCache, segments already in the cache
+    are reused as is. started() is called once the pool exists (or is not
+    needed). Returns (ok, stderr, dedup Counter).
+    """
+    timeline = Timeline(scenes, captions, duration)
+    profiler = options.get("profiler") or NULL_PROFILER
+    max_frames = (round(CACHE_SEGMENT_SECONDS * fps) if cache is not None
+                  else -(-total_frames // workers))
+    segments = _scene_segments(timeline, fps, total_frames, max_frames=max_frames)
+    # Split the cores between the concurrent libx264 encoders
+    threads = max(1, (os.cpu_count() or 1) // min(workers, len(segments)))
+
+    tmpdir = tempfile.mkdtemp(prefix="reel_seg_")
+    todo = []  # (index, start, stop, encode path, cache key)
+    try:
+        paths = []
+        for i, (start, stop) in enumerate(segments):
+            if cache is None:
+                paths.append(os.path.join(tmpdir, f"seg_{i:03d}.mp4"))
+                todo.append((i, start, stop, paths[-1], None))
+                continue
+            scene = timeline.scene_at(start / fps)
+            key = _segment_key(scenes, captions, scene_renderers, options, duration, fps,
+                               start, stop, scene, dict(encode, yuv420p=pix_fmt == 'yuv420p'))
+            if key is None:
+                if verbose:
+                    print(f"  Segment {i + 1}/{len(segments)} not cacheable: scene "
+                          f"{scene['id']} uses a value with no fingerprint", flush=True)
+                paths.append(os.path.join(tmpdir, f"seg_{i:03d}.mp4"))
+                todo.append((i, start, stop, paths[-1], None))
+                continue
+            paths.append(cache.get(key))
+            if paths[-1] is None:
+                todo.append((i, start, stop, cache.staging_path(key), key))
+            elif verbose:
+                print(f"  Segment {i + 1}/{len(segments)} cached "
+                      f"({start / fps:.1f}s-{stop / fps:.1f}s)", flush=True)
+
+        dedup = Counter()
+        if not todo and started is not None:
+            started()
+        if todo:
+            with _render_pool(min(workers, len(todo)), scenes, captions, scene_renderers,
+                              duration, options) as pool:
+                if started is not None:
+                    started()
+                results = [
+                    pool.apply_async(_encode_segment, (start, stop, fps, _encode_cmd(
+                        path, fps, pix_fmt, faststart=False, threads=threads, **encode),
+                        pix_fmt == 'yuv420p'))
+                    for i, start, stop, path, key in todo
+                ]
+                for (i, start, stop, path, key), result in zip(todo, results):
+                    returncode, stderr, seg_dedup, events = result.get()
+                    profiler.merge(events)
+                    if returncode != 0:
+                        return False, stderr, dedup
+                    if key is not None:
+                        paths[i] = cache.commit(key)
+                    dedup.update(seg_dedup)
+                    if verbose:
+                        print(f"  Segment {i + 1}/{len(segments)} encoded "
+                              f"({start / fps:.1f}s-{stop / fps:.1f}s)", flush=True)
+
+        if audio is not None:
+            with profiler.span("audio_wait"):
+                audio.prepare()
+        with profiler.span("concat"):
+            ok, stderr = _concat_segments(paths, output_path, tmpdir, audio)
+        return ok, stderr, dedup
+
+    finally:
+        # Staging files left by a failed encode (committed ones were moved)
+        for _, _, _, _, key in todo:
+            if key is not None:
+                cache.discard(key)
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def _concat_segments(paths, output_path, workdir, audio=None):
+    """
+    Join encoded segments with a stream-copy concat, adding audio (a
+    _NarrationInput) as AAC when given. Returns (ok, stderr).
+    """
+    list_path = os.path.join(workdir, "segments.txt")
+    with open(list_path, 'w') as f:
+        # The concat demuxer quotes like the shell: ' is written as '\''
+        f.writelines("file '{}'\n".format(path.replace("'", "'\\''")) for path in paths)
+
+    cmd = [
+        'ffmpeg', '-y',
+        '-f', 'concat', '-safe', '0',
+        '-i', list_path,
+    ]
+    if audio is None:
+        cmd += ['-c', 'copy']
+    else:
+        cmd += [*audio.args, '-map', '0:v', '-map', '1:a', '-c:v', 'copy', *_AAC_ARGS]
+    cmd += ['-movflags', '+faststart', output_path]
+
+    proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True,
+                            pass_fds=audio.pass_fds if audio is not None else ())
+    if audio is not None:
+        audio.start()
+    _, stderr = proc.communicate()
+    return proc.returncode == 0, stderr
+
+
+def _render_settings(fps, draft=False, reuse_buffer=False, yuv420p=False):
+    """(fps, scale, input pix_fmt, extra _encode_cmd arguments) for render options."""
+    scale = 1
+    x264_args = _X264_ARGS
+    if draft:
+        scale = DRAFT_SCALE if draft is True else draft
+        fps = min(fps, DRAFT_FPS)
+        x264_args = _DRAFT_X264_ARGS
+    pix_fmt = 'yuv420p' if yuv420p else 'rgb0' if reuse_buffer else 'rgb24'
+    return fps, scale, pix_fmt, dict(size=scaled_size(scale), x264_args=x264_args)
 
 
 def render_to_mp4(scenes, captions, scene_renderers, output_path,
-                  fps=30, duration=57, verbose=True):
+                  fps=30, duration=57, verbose=True, workers=1, max_inflight=None,
+                  static_renderers=None, stats=None, reuse_buffer=False,
+                  incremental=False, segments=False, cache_dir=None, draft=False,
+                  yuv420p=False, profiler=None, audio=None, on_workers_started=None):
     """
     Render a complete video to MP4.
 
@@ -23,47 +893,149 @@ def render_to_mp4(scenes, captions, scene_renderers, output_path,
         fps: frames per second (default 30)
         duration: total duration in seconds (default 57)
         verbose: print progress to stdout
+        workers: number of render processes (1 = render in this process).
+                 On platforms that spawn rather than fork (macOS,
+                 Windows), each worker re-imports the calling script, so
+                 call render_to_mp4 under `if __name__ == "__main__":`,
+                 and scene renderers must be picklable module-level
+                 functions.
+        max_inflight: max frames rendered ahead of the encoder when
+                      workers > 1 (default 4 × workers, ~6 MB per frame)
+        static_renderers: optional dict mapping scene_id → draw_static_N(draw, img)
+                          for per-scene layers rasterized once (see make_render_frame)
+        stats: optional dict, filled with render statistics:
+               'dedup' → {scene_id: frames reused from the previous frame}
+        reuse_buffer: draw into a ring of FRAME_RING preallocated frame
+                      buffers and write each to FFmpeg as 'rgb0' straight
+                      from a memoryview, instead of a new image plus a
+                      tobytes() copy per frame. With workers > 1 and no
+                      segments, frames still come back from the pool as bytes.
+        incremental: redraw only the regions that changed since the previous
+                     frame (see make_render_frame and scene_base.invalidates)
+        segments: split the timeline at scene boundaries (and into at most
+                  `workers` pieces), render and encode each piece in its own
+                  worker and FFmpeg process, then join them with a lossless
+                  stream-copy concat. Spreads encoding as well as rendering
+                  across cores.
+        cache_dir: directory of a content-addressed cache of encoded segments
+                   (True = ~/.cache/reel-maker/segments). Implies segments;
+                   only segments whose scene, renderer code, captions or
+                   encode settings changed are re-rendered. Scenes are cut
+                   into CACHE_SEGMENT_SECONDS slices rather than `workers`
+                   pieces, so cached segments survive a change of workers.
+                   Least recently used segments are evicted past
+                   SEGMENT_CACHE_MAX_BYTES.
+        draft: fast preview render from the same scene renderers: True for
+               DRAFT_SCALE (half) resolution, or a scale factor such as 0.25.
+               Caps fps at DRAFT_FPS and uses an ultrafast, lower-quality
+               encode. Coordinates, line widths and fonts are scaled together;
+               incremental is ignored.
+        yuv420p: convert frames to yuv420p with NumPy before piping them
+                 (rgb_to_yuv420p), halving pipe traffic and skipping
+                 FFmpeg's own colorspace conversion. Chroma is box-filtered
+                 and differs from FFmpeg's at hard colour edges, so the
+                 output is not identical to the default path. Requires NumPy.
+        profiler: optional core.profiling.Profiler recording per-frame stage
+                  spans (scene draw, progress bar, caption, tobytes, pipe
+                  write), including those of worker processes.
+        audio: optional narration to mux in the same FFmpeg pass: a WAV path
+               (generate_narration) or a float sample buffer at 44.1 kHz,
+               or (samples, rate) (tts.mix_narration). Encoded as AAC 192k,
+               44.1 kHz, cut to the video length; no separate
+               mux_audio_video pass is needed. May be a Future still being
+               produced (see core.pipeline): FFmpeg starts with an audio
+               pipe that is fed once the Future resolves, so the frames
+               are encoded meanwhile and the file is still written once
+               ('audio_wait' spans the wait after the last frame). With
+               segments, or where pipes cannot be passed (Windows), the
+               narration is added by the final stream-copy join instead.
+        on_workers_started: called once the render processes are forked
+                            (or right away when none are needed), before
+                            render_to_mp4 starts threads of its own. Start
+                            work that runs alongside the render here rather
+                            than before the call: forking a process while
+                            other threads hold locks can deadlock the
+                            workers. core.pipeline starts its narration so.
     """
+    fps, scale, pix_fmt, encode = _render_settings(fps, draft, reuse_buffer, yuv420p)
+    size = encode["size"]
     total_frames = duration * fps
-    render_frame = make_render_frame(scenes, captions, scene_renderers, duration)
 
     if verbose:
-        print(f"Rendering {total_frames} frames at {W}x{H} @{fps}fps...")
+        mode = f" on {workers} workers" if workers > 1 else ""
+        label = " (draft)" if draft else ""
+        print(f"Rendering {total_frames} frames at {size[0]}x{size[1]} @{fps}fps{mode}{label}...")
         print(f"Output: {output_path}")
 
-    cmd = [
-        'ffmpeg', '-y',
-        '-f', 'rawvideo',
-        '-vcodec', 'rawvideo',
-        '-pix_fmt', 'rgb24',
-        '-s', f'{W}x{H}',
-        '-r', str(fps),
-        '-i', '-',
-        '-c:v', 'libx264',
-        '-preset', 'medium',
-        '-crf', '18',
-        '-pix_fmt', 'yuv420p',
-        '-movflags', '+faststart',
-        '-an',
-        output_path
-    ]
+    profiler = profiler or NULL_PROFILER
+    # Frames reach FFmpeg straight from a ring of buffers, except from the
+    # piped pool, which ships each frame back as bytes anyway
+    if reuse_buffer and (segments or cache_dir or workers <= 1):
+        reuse_buffer = FRAME_RING
+    options = dict(static_renderers=static_renderers, reuse_buffer=reuse_buffer,
+                   incremental=incremental, scale=scale, profiler=profiler)
 
-    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    cache = None
+    if cache_dir:
+        cache = SegmentCache(None if cache_dir is True else cache_dir)
 
-    for frame_num in range(total_frames):
-        t = frame_num / fps
-        img = render_frame(t)
-        proc.stdin.write(img.tobytes())
+    called = []
+
+    def started():
+        if not called:
+            called.append(True)
+            if on_workers_started is not None:
+                on_workers_started()
 
-        if verbose and frame_num % fps == 0:
-            pct = frame_num / total_frames * 100
-            print(f"  {pct:5.1f}% — {int(t)}s / {duration}s", flush=True)
+    narration = _NarrationInput(audio) if audio is not None else None
+    tmpdir = None
+    try:
+        with profiler.span("render_to_mp4"):
+            if segments or cache:
+                ok, stderr, dedup = _render_segmented(scenes, captions, scene_renderers,
+                                                      duration, options, fps, total_frames,
+                                                      workers, pix_fmt, output_path, verbose,
+                                                      encode, cache, narration, started)
+            elif narration is not None and not narration.ready and not narration.late:
+                # No pipe for a late narration (Windows): encode the frames now
+                # and join the narration once it arrives
+                tmpdir = tempfile.mkdtemp(prefix="reel_mux_")
+                silent_path = os.path.join(tmpdir, "video.mp4")
+                ok, stderr, dedup = _render_piped(scenes, captions, scene_renderers, duration,
+                                                  options, fps, total_frames, workers,
+                                                  max_inflight, pix_fmt, silent_path, verbose,
+                                                  dict(encode, faststart=False),
+                                                  started=started)
+                if ok:
+                    with profiler.span("audio_wait"):
+                        narration.prepare()
+                    with profiler.span("mux"):
+                        ok, stderr = _concat_segments([silent_path], output_path, tmpdir,
+                                                      narration)
+            else:
+                if narration is not None:
+                    narration.prepare(wait=False)
+                ok, stderr, dedup = _render_piped(scenes, captions, scene_renderers, duration,
+                                                  options, fps, total_frames, workers,
+                                                  max_inflight, pix_fmt, output_path, verbose,
+                                                  encode, narration, started)
+    finally:
+        if narration is not None:
+            narration.close()
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+        if cache:
+            cache.evict()
 
-    proc.stdin.close()
-    stderr = proc.stderr.read().decode()
-    proc.wait()
+    if stats is not None:
+        stats["dedup"] = {s["id"]: dedup[s["id"]] for s in scenes}
+        if cache:
+            stats["cache"] = cache.stats()
+    if verbose and dedup:
+        per_scene = ", ".join(f"scene {sid}: {n}" for sid, n in sorted(dedup.items()))
+        print(f"  Reused {sum(dedup.values())} duplicate frames ({per_scene})")
 
-    if proc.returncode == 0:
+    if ok:
         size_mb = os.path.getsize(output_path) / 1024 / 1024
         if verbose:
             print(f"\n✅ Done! {output_path} ({size_mb:.1f} MB)")
@@ -74,9 +1046,11 @@ def render_to_mp4(scenes, captions, scene_renderers, output_path,
         return False
 
 
-def validate_output(output_path, expected_duration=57, expected_fps=30):
+def validate_output(output_path, expected_duration=57, expected_fps=30,
+                    expected_size=(W, H)):
     """
     Validate MP4 output using FFprobe. Returns (valid, info_dict).
+    For draft renders pass the draft fps and scaled_size(scale).
     """
     import json
 
@@ -92,7 +1066,9 @@ def validate_output(output_path, expected_duration=57, expected_fps=30):
         return False, {"error": "FFprobe failed"}
 
     data = json.loads(result.stdout)
-    stream = data['streams'][0]
+    # The video stream (muxed outputs also carry an AAC stream)
+    stream = next((s for s in data['streams'] if s.get('codec_type') == 'video'),
+                  data['streams'][0])
 
     info = {
         "codec": stream.get("codec_name"),
@@ -108,8 +1084,7 @@ def validate_output(output_path, expected_duration=57, expected_fps=30):
     expected_frames = str(expected_duration * expected_fps)
     valid = (
         info["codec"] == "h264" and
-        info["width"] == 1080 and
-        info["height"] == 1920 and
+        (info["width"], info["height"]) == tuple(expected_size) and
         info["fps"] == f"{expected_fps}/1" and
         info["pix_fmt"] == "yuv420p" and
         info["frames"] == expected_frames
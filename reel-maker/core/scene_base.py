@@ -3,89 +3,666 @@ Shared scene infrastructure for reel-maker.
 Provides progress bar, caption overlay, and the main render_frame shell.
 """
 
+from bisect import bisect_right
 from .drawing import *
+from .profiling import NULL_PROFILER
 
 
-def draw_progress_bar(draw, t, scenes, duration):
+class Timeline:
     """
-    Draw segmented progress bar at top of frame.
-    scenes: list of dicts with 'start', 'end', 'label', 'color' keys.
+    Lookup index over scenes and captions, built once per video.
+
+    Active scene and caption are found by bisection instead of a linear
+    scan per frame, and the progress-bar segment geometry is precomputed.
+    Scenes and captions are assumed not to overlap in time.
     """
+
     barY, barH, pad = 55, 10, 40
-    totalW = W - pad * 2
-    x = pad
 
-    for s in scenes:
-        seg_dur = s["end"] - s["start"]
-        segW = int((seg_dur / duration) * totalW)
-        segP = 0 if t < s["start"] else (1 if t > s["end"] else (t - s["start"]) / seg_dur)
+    def __init__(self, scenes, captions, duration):
+        self.scenes = scenes
+        self.captions = captions
+        self.duration = duration
+
+        by_start = sorted(scenes, key=lambda s: s["start"])
+        self._scene_starts = [s["start"] for s in by_start]
+        self._scenes_by_start = by_start
 
-        # Background segment
+        caps = sorted(captions, key=lambda c: c[0])
+        self._caption_starts = [c[0] for c in caps]
+        self._captions_by_start = caps
+
+        # (x, segW, scene) per progress-bar segment, in scene list order
+        totalW = W - self.pad * 2
+        x = self.pad
+        self.segments = []
+        for s in scenes:
+            segW = int(((s["end"] - s["start"]) / duration) * totalW)
+            self.segments.append((x, segW, s))
+            x += segW
+
+    def scene_at(self, t):
+        """Scene active at time t (the last scene once t runs past the end)."""
+        i = bisect_right(self._scene_starts, t) - 1
+        if i >= 0 and t < self._scenes_by_start[i]["end"]:
+            return self._scenes_by_start[i]
+        return self.scenes[-1]
+
+    def scene_progress(self, t):
+        """(scene, progress 0-1) at time t."""
+        scene = self.scene_at(t)
+        progress = max(0, min(1, (t - scene["start"]) / (scene["end"] - scene["start"])))
+        return scene, progress
+
+    def caption_at(self, t):
+        """Caption tuple on screen at time t, or None."""
+        i = bisect_right(self._caption_starts, t) - 1
+        if i >= 0 and t < self._captions_by_start[i][1]:
+            return self._captions_by_start[i]
+        return None
+
+    def progress_fills(self, t):
+        """Fill width in pixels of each progress-bar segment at time t (0 = empty)."""
+        fills = []
+        for x, segW, s in self.segments:
+            if t <= s["start"]:
+                fills.append(0)
+            elif t > s["end"]:
+                fills.append(max(4, segW - 4))
+            else:
+                segP = (t - s["start"]) / (s["end"] - s["start"])
+                fills.append(max(4, int((segW - 4) * segP)))
+        return fills
+
+
+def draw_progress_track(draw, scenes, duration, timeline=None):
+    """
+    Draw the empty progress-bar track (one background segment per scene).
+    The track never changes, so make_render_frame rasterizes it once.
+    """
+    timeline = timeline or Timeline(scenes, [], duration)
+    barY, barH = timeline.barY, timeline.barH
+
+    for x, segW, s in timeline.segments:
         draw_rounded_rect(draw, (x, barY, x + segW - 4, barY + barH), 5,
                           fill=rgba(WHITE, 0.08))
-        # Fill
-        if segP > 0:
-            fw = max(4, int((segW - 4) * segP))
+
+
+def draw_progress_bar(draw, t, scenes, duration, track=True, timeline=None, img=None,
+                      origin=(0, 0)):
+    """
+    Draw segmented progress bar at top of frame.
+    scenes: list of dicts with 'start', 'end', 'label', 'color' keys.
+    track: also draw the empty background segments (False when the
+           track has already been composited from a static layer).
+    timeline: prebuilt Timeline for these scenes (built on the fly if None)
+    img: the image draw paints on; when given, the label and time text are
+         pasted from cached glyph masks instead of rasterized each frame
+         (origin: full-frame position of img's top-left, for crops)
+    """
+    timeline = timeline or Timeline(scenes, [], duration)
+    barY, barH, pad = timeline.barY, timeline.barH, timeline.pad
+
+    if track:
+        draw_progress_track(draw, scenes, duration, timeline)
+
+    for (x, segW, s), fw in zip(timeline.segments, timeline.progress_fills(t)):
+        if fw:
             draw_rounded_rect(draw, (x, barY, x + fw, barY + barH), 5,
                               fill=s["color"])
-        x += segW
 
     # Scene label + time
-    scene = next((s for s in scenes if s["start"] <= t < s["end"]), scenes[-1])
-    left_text(draw, scene["label"], pad, barY + 30, font_mono(24), fill=GRAY)
-    right_text(draw, f"{int(t)}s / {duration}s", W - pad, barY + 30, font_mono(24), fill=GRAY)
+    scene = timeline.scene_at(t)
+    label, time_text = scene["label"], f"{int(t)}s / {duration}s"
+    if img is None:
+        left_text(draw, label, pad, barY + 30, font_mono(24), fill=GRAY)
+        right_text(draw, time_text, W - pad, barY + 30, font_mono(24), fill=GRAY)
+        return
+
+    ox, oy = origin
+    for text, x, align_right in ((label, pad, False), (time_text, W - pad, True)):
+        mask, (x, y) = _label_sprite(text, x, barY + 30, align_right)
+        img.paste(GRAY, (x - ox, y - oy), mask)
 
 
-def draw_caption(draw, t, captions):
+def draw_caption(draw, t, captions, timeline=None, img=None, origin=(0, 0)):
     """
     Draw 3-5 word caption overlay at bottom of frame.
     captions: list of (start_time, end_time, text) tuples.
+    timeline: prebuilt Timeline for these captions (built on the fly if None)
+    img: the image draw paints on; when given, each distinct caption's
+         pill and text are rasterized once into cached masks and pasted
+         (origin: full-frame position of img's top-left, for crops)
     """
-    cap = next((c for c in captions if c[0] <= t < c[1]), None)
+    if timeline is not None:
+        cap = timeline.caption_at(t)
+    else:
+        cap = next((c for c in captions if c[0] <= t < c[1]), None)
     if not cap:
         return
 
     text = cap[2]
+    if img is not None:
+        for mask, (x, y), color in _caption_sprite(text):
+            img.paste(color, (x - origin[0], y - origin[1]), mask)
+        return
+
+    draw_rounded_rect(draw, caption_box(text), 14, fill=rgba((0, 0, 0), 0.75))
+    centered_text(draw, text, W // 2, H - 170, font_mono(48, bold=True), fill=WHITE)
+
+
+def caption_box(text):
+    """(x0, y0, x1, y1) of the caption pill for text."""
     cy = H - 170
-    f = font_mono(48, bold=True)
-    bbox = f.getbbox(text)
+    bbox = font_mono(48, bold=True).getbbox(text)
     tw = bbox[2] - bbox[0]
     th = bbox[3] - bbox[1]
     pw, ph = tw + 50, th + 28
 
     rx, ry = W // 2 - pw // 2, cy - ph // 2
-    draw_rounded_rect(draw, (rx, ry, rx + pw, ry + ph), 14,
-                      fill=rgba((0, 0, 0), 0.75))
-    centered_text(draw, text, W // 2, cy, f, fill=WHITE)
+    return (rx, ry, rx + pw, ry + ph)
+
+
+# ── Overlay Sprites ─────────────────────────────────────
+# A reel has a few dozen captions and one time string per second, so the
+# overlay shapes and text are rasterized once into masks and pasted in
+# their color on every frame they appear in. Masks are drawn with the same
+# primitives at translated integer coordinates, so pasting them gives the
+# same pixels as drawing in place. Text comes from drawing.text_mask, and
+# the sprites are text caches too, so clear_font_cache() empties them.
+SPRITE_CACHE_SIZE = 256
+
+
+@text_cache(SPRITE_CACHE_SIZE)
+def _caption_sprite(text):
+    """[(mask, top-left, color), ...] pasted in order to draw the caption."""
+    from PIL import Image, ImageDraw
+
+    x0, y0, x1, y1 = caption_box(text)
+    pill = Image.new('L', (x1 - x0 + 1, y1 - y0 + 1), 0)   # the pill includes x1/y1
+    draw_rounded_rect(ImageDraw.Draw(pill), (0, 0, x1 - x0, y1 - y0), 14, fill=255)
+
+    # Same text origin as centered_text
+    f = font_mono(48, bold=True)
+    (l, t, r, b), mask, (dx, dy) = text_mask(text, f)
+    tx, ty = W // 2 - (r - l) // 2, H - 170 - (b - t) // 2
+    return [(pill, (x0, y0), rgba((0, 0, 0), 0.75)), (mask, (tx + dx, ty + dy), WHITE)]
+
+
+@text_cache(SPRITE_CACHE_SIZE)
+def _label_sprite(text, x, cy, align_right):
+    """(glyph mask, top-left) of progress-bar text left/right-aligned at x."""
+    f = font_mono(24)
+    (l, t, r, b), mask, (dx, dy) = text_mask(text, f)
+    # Same text origin as left_text / right_text
+    tx = x - (r - l) if align_right else x
+    ty = cy - (b - t) // 2
+    return mask, (tx + dx, ty + dy)
+
+
+# ── Incremental Rendering ───────────────────────────────
+def invalidates(dirty_boxes):
+    """
+    Decorator opting a scene renderer into dirty-rectangle rendering.
+
+    dirty_boxes(prev_progress, progress) returns the (x0, y0, x1, y1) boxes
+    whose pixels may differ between the two progress values; everything
+    outside them is carried over from the previous frame. The renderer must
+    draw only through `draw` (not by touching `img` pixels directly), since
+    it is re-run per box with a translated, clipped draw.
+
+        @invalidates(lambda prev, p: [(310, 384, 770, 1284)])
+        def draw_scene2(draw, img, p): ...
+    """
+    def wrap(renderer):
+        renderer.dirty_boxes = dirty_boxes
+        return renderer
+    return wrap
+
+
+def _translate(xy, dx, dy):
+    """Shift Pillow-style coordinates (flat or as point pairs) by (-dx, -dy)."""
+    if isinstance(xy[0], (int, float)):
+        return [v - (dx if i % 2 == 0 else dy) for i, v in enumerate(xy)]
+    return [(x - dx, y - dy) for x, y in xy]
+
+
+class _ClipDraw:
+    """
+    ImageDraw wrapper that draws full-frame coordinates into a crop of box.
+
+    Shapes are translated so box's top-left maps to (0, 0) and Pillow
+    clips them to the crop. Text and bitmaps that fall entirely outside
+    box are skipped before they are rasterized.
+    """
+
+    _XY_METHODS = {"arc", "chord", "circle", "ellipse", "line", "pieslice", "point",
+                   "polygon", "rectangle", "regular_polygon", "rounded_rectangle"}
+    _TEXTBBOX_ARGS = {"anchor", "spacing", "align", "direction", "features",
+                      "language", "stroke_width", "embedded_color", "font_size"}
+
+    def __init__(self, draw, box):
+        self._draw = draw
+        self._box = box
+
+    def __getattr__(self, name):
+        attr = getattr(self._draw, name)
+        if name not in self._XY_METHODS:
+            return attr
+
+        def translated(xy, *args, **kwargs):
+            return attr(_translate(xy, self._box[0], self._box[1]), *args, **kwargs)
+
+        return translated
+
+    def _overlaps(self, bbox):
+        x0, y0, x1, y1 = self._box
+        return bbox[0] < x1 and bbox[2] > x0 and bbox[1] < y1 and bbox[3] > y0
+
+    def text(self, xy, text, fill=None, font=None, *args, **kwargs):
+        bbox_args = {k: v for k, v in kwargs.items() if k in self._TEXTBBOX_ARGS}
+        if self._overlaps(self._draw.textbbox(xy, text, font=font, **bbox_args)):
+            x, y = xy
+            self._draw.text((x - self._box[0], y - self._box[1]), text, fill, font,
+                            *args, **kwargs)
+
+    def bitmap(self, xy, bitmap, fill=None):
+        x, y = xy
+        if self._overlaps((x, y, x + bitmap.width, y + bitmap.height)):
+            self._draw.bitmap((x - self._box[0], y - self._box[1]), bitmap, fill)
+
+
+def _clamp_box(box):
+    """Integer box clipped to the frame, or None if empty."""
+    x0, y0, x1, y1 = (int(v) for v in box)
+    x0, y0, x1, y1 = max(0, x0), max(0, y0), min(W, x1 + 1), min(H, y1 + 1)
+    return (x0, y0, x1, y1) if x0 < x1 and y0 < y1 else None
+
+
+# ── Draft Scaling ───────────────────────────────────────
+def scaled_size(scale):
+    """Frame size at scale, rounded to even dimensions for yuv420p."""
+    return max(2, round(W * scale / 2) * 2), max(2, round(H * scale / 2) * 2)
+
+
+def _scale(xy, scale):
+    """Scale Pillow-style coordinates (flat, point pairs or nested) by scale."""
+    if isinstance(xy, (int, float)):
+        return xy * scale
+    scaled = [_scale(v, scale) for v in xy]
+    return tuple(scaled) if isinstance(xy, tuple) else scaled
 
 
-def make_render_frame(scenes, captions, scene_renderers, duration):
+def _scale_box(box, scale):
+    return tuple(round(v * scale) for v in box)
+
+
+class _ScaleDraw:
+    """
+    ImageDraw wrapper that draws full-frame (W×H) coordinates onto a frame
+    scaled by scale.
+
+    Positions, line widths, radii and font sizes are all scaled, so scene
+    renderers run unchanged at draft resolution. textbbox/textlength keep
+    answering in full-frame units, like the fonts renderers measure with.
+    """
+
+    # Positional index (after xy) of width/radius arguments per method
+    _LENGTH_POSITIONS = {"arc": (3,), "chord": (4,), "circle": (0, 3), "ellipse": (2,),
+                         "line": (1,), "pieslice": (4,), "polygon": (2,), "rectangle": (2,),
+                         "regular_polygon": (4,), "rounded_rectangle": (0, 3)}
+    _LENGTH_ARGS = {"width", "radius", "stroke_width", "spacing", "font_size"}
+
+    def __init__(self, draw, scale):
+        self._draw = draw
+        self._s = scale
+
+    def _length(self, name, v):
+        if name == "radius":
+            return v * self._s
+        return max(1, round(v * self._s)) if v else v
+
+    def _lengths(self, kwargs):
+        return {k: self._length(k, v) if k in self._LENGTH_ARGS and v is not None else v
+                for k, v in kwargs.items()}
+
+    def __getattr__(self, name):
+        attr = getattr(self._draw, name)
+        if name not in self._LENGTH_POSITIONS and name != "point":
+            return attr
+
+        def scaled(xy, *args, **kwargs):
+            args = list(args)
+            for i in self._LENGTH_POSITIONS.get(name, ()):
+                if i < len(args) and args[i] is not None:
+                    args[i] = self._length("radius" if i == 0 else "width", args[i])
+            return attr(_scale(xy, self._s), *args, **self._lengths(kwargs))
+
+        return scaled
+
+    def text(self, xy, text, fill=None, font=None, *args, **kwargs):
+        if font is not None:
+            font = scale_font(font, self._s)
+        self._draw.text(_scale(xy, self._s), text, fill, font, *args, **self._lengths(kwargs))
+
+    def multiline_text(self, xy, text, fill=None, font=None, *args, **kwargs):
+        if font is not None:
+            font = scale_font(font, self._s)
+        self._draw.multiline_text(_scale(xy, self._s), text, fill, font, *args,
+                                  **self._lengths(kwargs))
+
+    def bitmap(self, xy, bitmap, fill=None):
+        size = (max(1, round(bitmap.width * self._s)), max(1, round(bitmap.height * self._s)))
+        self._draw.bitmap(_scale(xy, self._s), bitmap.resize(size), fill)
+
+
+def render_static_layer(draw_static, mode='RGB', scale=1):
+    """
+    Rasterize draw_static(draw, img) once onto a blank BG frame.
+    The result is the starting canvas for every frame that uses it.
+    """
+    from PIL import Image, ImageDraw
+
+    img = Image.new(mode, scaled_size(scale), BG)
+    draw = ImageDraw.Draw(img)
+    draw_static(draw if scale == 1 else _ScaleDraw(draw, scale), img)
+    return img
+
+
+def render_static_overlay(draw_static, box, scale=1):
+    """
+    Rasterize draw_static(draw, img) once as an overlay confined to box
+    (full-frame coordinates). Returns (layer, mask) for
+    img.paste(layer, box, mask), with box scaled by scale. Only opaque
+    shapes are captured; anti-aliased text edges are not.
+    """
+    from PIL import Image, ImageChops, ImageDraw
+
+    on_black = Image.new('RGB', scaled_size(scale), (0, 0, 0))
+    on_white = Image.new('RGB', scaled_size(scale), (255, 255, 255))
+    box = _scale_box(box, scale)
+    for img in (on_black, on_white):
+        draw = ImageDraw.Draw(img)
+        draw_static(draw if scale == 1 else _ScaleDraw(draw, scale), img)
+
+    # Pixels the drawing covered are identical on both backgrounds
+    diff = ImageChops.difference(on_black, on_white).convert('L')
+    mask = diff.point(lambda v: 255 if v == 0 else 0)
+    return on_black.crop(box), mask.crop(box)
+
+
+def make_render_frame(scenes, captions, scene_renderers, duration,
+                      static_renderers=None, reuse_buffer=False, incremental=False,
+                      scale=1, profiler=None):
     """
     Returns a render_frame(t) function that draws any frame at time t.
 
-    scenes: list of scene dicts
+    scenes: list of scene dicts. An optional 'frozen_after' key (0-1)
+        declares that the scene's renderer draws the same pixels for every
+        progress >= that value; the scene is then rendered once at that
+        point and reused for the rest of the scene.
     captions: list of (start, end, text) tuples
     scene_renderers: dict mapping scene_id → draw_scene_N(draw, img, progress)
     duration: total video duration in seconds
+    static_renderers: optional dict mapping scene_id → draw_static_N(draw, img)
+        for pixels that never change during the scene (backgrounds, grids,
+        scan lines). Each is rasterized once, on first use, and every frame
+        of that scene starts from a copy of it; draw_scene_N then only draws
+        the animated parts on top.
+    reuse_buffer: draw every frame into a preallocated RGBX buffer instead
+        of a new image. render_frame(t) then returns that image and
+        render_frame.buffer is a memoryview of its raw bytes, laid out as
+        FFmpeg's 'rgb0' pix_fmt. True keeps one buffer (consume each frame
+        before the next call); an int N rotates through N buffers, so a
+        frame stays valid for the next N - 1 calls while it is queued.
+    incremental: carry each frame over to the next and redraw only what
+        changed: the boxes reported by renderers decorated with
+        @invalidates, plus the progress bar and caption when they change.
+        Scene changes and undecorated renderers still redraw in full.
+    scale: draw frames at scale × full resolution (draft renders). Renderers
+        keep drawing in full-frame coordinates through a draw that scales
+        positions, widths and fonts; their img argument is the scaled frame.
+        incremental is ignored when scale != 1.
+    profiler: optional core.profiling.Profiler; each frame, scene draw,
+        progress bar and caption is recorded as a span labelled by scene id.
+
+    render_frame.pix_fmt is the raw layout of frames ('rgb24' or 'rgb0').
+    render_frame.size is the (width, height) of frames.
+    render_frame.profiler is the profiler in use (NULL_PROFILER when off).
+    render_frame.timeline is the Timeline index shared by all overlays.
+    render_frame.frame_key(t) returns a hashable key for the pixels of
+    frame t while its scene is frozen (equal keys = identical frames), or
+    None while the scene is still animating.
     """
-    from PIL import Image, ImageDraw
+    return _FrameRenderer(scenes, captions, scene_renderers, duration,
+                          static_renderers or {}, reuse_buffer,
+                          incremental and scale == 1, scale, profiler or NULL_PROFILER)
 
-    def render_frame(t):
-        img = Image.new('RGB', (W, H), BG)
-        draw = ImageDraw.Draw(img)
 
-        scene = next((s for s in scenes if s["start"] <= t < s["end"]), scenes[-1])
-        progress = max(0, min(1, (t - scene["start"]) / (scene["end"] - scene["start"])))
+class _FrameRenderer:
+    """The render_frame(t) callable built by make_render_frame."""
 
-        # Render scene content
-        renderer = scene_renderers.get(scene["id"])
-        if renderer:
-            renderer(draw, img, progress)
+    # Everything the progress bar draws: track, fill, scene label and time
+    _bar_box = (0, 50, W, 125)
+
+    def __init__(self, scenes, captions, scene_renderers, duration,
+                 static_renderers, reuse_buffer, incremental, scale, profiler):
+        from PIL import Image
+
+        self.scenes = scenes
+        self.captions = captions
+        self.scene_renderers = scene_renderers
+        self.duration = duration
+        self.static_renderers = static_renderers
+        self.reuse_buffer = reuse_buffer
+        self.incremental = incremental
+        self.scale = scale
+        self.size = scaled_size(scale)
+        self.profiler = profiler
+        self.timeline = Timeline(scenes, captions, duration)
+        self.mode = 'RGBX' if reuse_buffer else 'RGB'
+        self.pix_fmt = 'rgb0' if reuse_buffer else 'rgb24'
+        self._layers = {}
+        self._frozen = {}
+
+        # The empty progress-bar track is identical on every frame
+        self._track_box = _scale_box((0, 50, W, 70), scale)
+        track, self._track_mask = render_static_overlay(
+            lambda draw, img: draw_progress_track(draw, scenes, duration, self.timeline),
+            (0, 50, W, 70), scale)
+        self._track = track.convert(self.mode)
+
+        self.buffer = None
+        self._canvas = None
+        self._ring = []
+        self._canvas_draws = {}
+        for _ in range(int(reuse_buffer)):
+            buf = bytearray(self.size[0] * self.size[1] * 4)
+            canvas = Image.frombuffer(self.mode, self.size, buf, 'raw', self.mode, 0, 1)
+            canvas.readonly = 0  # draw into buf itself, not a private copy
+            self._ring.append((canvas, memoryview(buf)))
+        if self._ring:
+            self._canvas, self.buffer = self._ring[0]
+
+        # Incremental state: scene-only image and what the last frame showed
+        self._scene_img = None
+        self._frame_img = self._canvas
+        self._last = None
+        self._scene_id = None
+
+    # ── Frame assembly ──
+    def __call__(self, t):
+        if len(self._ring) > 1:
+            self._ring.append(self._ring.pop(0))
+            self._canvas, self.buffer = self._ring[0]
+        scene, progress = self.timeline.scene_progress(t)
+        self._scene_id = scene["id"]
+        with self.profiler.span("frame", scene=scene["id"]):
+            if self.incremental:
+                return self._render_incremental(t, scene, progress)
+
+            # Render scene content
+            if self._is_frozen(scene, progress):
+                img = self._new_frame(self._frozen_scene(scene, progress))
+            else:
+                img = self._draw_scene(scene, progress)
+
+            # Overlay shared elements
+            self._draw_overlays(self._draw_for(img), img, t)
+            return img
 
-        # Overlay shared elements
-        draw_progress_bar(draw, t, scenes, duration)
-        draw_caption(draw, t, captions)
+    def frame_key(self, t):
+        scene, progress = self.timeline.scene_progress(t)
+        if not self._is_frozen(scene, progress):
+            return None
+        return (scene["id"],) + self._overlay_state(t)
 
+    def _new_frame(self, base=None):
+        """A frame to draw on, starting from base (or a plain BG fill)."""
+        from PIL import Image
+
+        if not self.reuse_buffer:
+            return base.copy() if base is not None else Image.new(self.mode, self.size, BG)
+        if base is not None:
+            self._canvas.paste(base)
+        else:
+            self._canvas.paste(BG, (0, 0) + self.size)
+        return self._canvas
+
+    def _draw_for(self, img):
+        from PIL import ImageDraw
+
+        if img is self._canvas:
+            if id(img) not in self._canvas_draws:
+                self._canvas_draws[id(img)] = self._scaled(ImageDraw.Draw(img))
+            return self._canvas_draws[id(img)]
+        return self._scaled(ImageDraw.Draw(img))
+
+    def _scaled(self, draw):
+        return draw if self.scale == 1 else _ScaleDraw(draw, self.scale)
+
+    def _base(self, scene):
+        """Static layer for scene (rasterized on first use), or None for plain BG."""
+        draw_static = self.static_renderers.get(scene["id"])
+        if draw_static is None:
+            return None
+        if scene["id"] not in self._layers:
+            self._layers[scene["id"]] = render_static_layer(draw_static, self.mode, self.scale)
+        return self._layers[scene["id"]]
+
+    def _is_frozen(self, scene, progress):
+        return scene.get("frozen_after") is not None and progress >= scene["frozen_after"]
+
+    def _draw_scene(self, scene, progress):
+        img = self._new_frame(self._base(scene))
+        renderer = self.scene_renderers.get(scene["id"])
+        if renderer:
+            with self.profiler.span("scene", scene=scene["id"]):
+                renderer(self._draw_for(img), img, progress)
         return img
 
-    return render_frame
+    def _frozen_scene(self, scene, progress):
+        if scene["id"] not in self._frozen:
+            self._frozen[scene["id"]] = self._draw_scene(scene, progress).copy()
+        return self._frozen[scene["id"]]
+
+    def _draw_overlays(self, draw, img, t, origin=(0, 0)):
+        x0, y0, x1, y1 = self._track_box
+        ox, oy = origin
+        # Sprites are full-size; draft frames draw the overlays scaled instead
+        sprites = img if self.scale == 1 else None
+        with self.profiler.span("progress_bar", scene=self._scene_id):
+            img.paste(self._track, (x0 - ox, y0 - oy, x1 - ox, y1 - oy), self._track_mask)
+            draw_progress_bar(draw, t, self.scenes, self.duration, track=False,
+                              timeline=self.timeline, img=sprites, origin=origin)
+        with self.profiler.span("caption", scene=self._scene_id):
+            draw_caption(draw, t, self.captions, self.timeline, img=sprites, origin=origin)
+
+    def _overlay_state(self, t):
+        """(progress-bar state, caption) — equal states draw identical overlays."""
+        bar = (tuple(self.timeline.progress_fills(t)), self.timeline.scene_at(t)["id"], int(t))
+        return bar, self.timeline.caption_at(t)
+
+    # ── Incremental rendering ──
+    def _render_incremental(self, t, scene, progress):
+        from PIL import Image, ImageDraw
+
+        scene_boxes = self._update_scene(scene, progress)
+        overlays = self._overlay_state(t)
+
+        frame = self._canvas if self.reuse_buffer else self._frame_img
+        if frame is None:
+            frame = Image.new(self.mode, (W, H), BG)
+
+        if scene_boxes is None:
+            frame.paste(self._scene_img)
+            self._draw_overlays(self._draw_for(frame), frame, t)
+        else:
+            if frame is not self._frame_img:
+                frame.paste(self._frame_img)  # next buffer of the ring: carry the frame over
+            boxes = list(scene_boxes)
+            last_bar, last_caption = self._last[1]
+            bar, caption = overlays
+            if bar != last_bar:
+                boxes.append(self._bar_box)
+            if caption != last_caption:
+                boxes.extend(caption_box(c[2]) for c in (last_caption, caption) if c)
+
+            for box in filter(None, map(_clamp_box, boxes)):
+                sub = self._scene_img.crop(box)
+                self._draw_overlays(_ClipDraw(ImageDraw.Draw(sub), box), sub, t, box[:2])
+                frame.paste(sub, box)
+
+        self._frame_img = frame
+        self._last = ((scene["id"], progress), overlays)
+        return frame if self.reuse_buffer else frame.copy()
+
+    def _update_scene(self, scene, progress):
+        """
+        Bring the scene-only image up to date for (scene, progress).
+        Returns the boxes that were redrawn, or None after a full redraw.
+        """
+        from PIL import Image, ImageDraw
+
+        last_scene = self._last[0] if self._last else None
+        renderer = self.scene_renderers.get(scene["id"])
+        dirty_boxes = getattr(renderer, "dirty_boxes", None)
+
+        if last_scene is None or last_scene[0] != scene["id"]:
+            boxes = None
+        elif self._is_frozen(scene, last_scene[1]) and self._is_frozen(scene, progress):
+            boxes = []
+        elif dirty_boxes is not None and not self._is_frozen(scene, progress):
+            boxes = dirty_boxes(last_scene[1], progress)
+        else:
+            boxes = None
+
+        if boxes is None:
+            if self._is_frozen(scene, progress):
+                self._scene_img = self._frozen_scene(scene, progress).copy()
+            else:
+                base = self._base(scene)
+                self._scene_img = self._draw_scene_into(scene, progress, base)
+            return None
+
+        base = self._base(scene)
+        for box in filter(None, map(_clamp_box, boxes)):
+            if base is not None:
+                sub = base.crop(box)
+            else:
+                sub = Image.new(self.mode, (box[2] - box[0], box[3] - box[1]), BG)
+            with self.profiler.span("scene", scene=scene["id"]):
+                renderer(_ClipDraw(ImageDraw.Draw(sub), box), sub, progress)
+            self._scene_img.paste(sub, box)
+        return boxes
+
+    def _draw_scene_into(self, scene, progress, base):
+        """Full scene redraw into a private image (never the shared canvas)."""
+        from PIL import Image, ImageDraw
+
+        img = base.copy() if base is not None else Image.new(self.mode, (W, H), BG)
+        renderer = self.scene_renderers.get(scene["id"])
+        if renderer:
+            with self.profiler.span("scene", scene=scene["id"]):
+                renderer(ImageDraw.Draw(img), img, progress)
+        return img
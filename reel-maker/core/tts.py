@@ -11,18 +11,32 @@ Usage:
     
     # Auto-detects best available backend
     audio_path = generate_narration(scenes, output_dir="/home/user/output")
+
+    # Models load once per process; pass a session to control its lifetime
+    with DiaHFSession() as session:
+        for video in videos:
+            generate_narration(video.scenes, video.output_dir, session=session)
     
-    # Mux narration into silent MP4
+    # Encode it with the frames (one FFmpeg pass)...
+    render_to_mp4(scenes, captions, scene_renderers, "final.mp4", audio=audio_path)
+
+    # ...or mux narration into an already rendered silent MP4
     mux_audio_video("video.mp4", audio_path, "final.mp4")
 """
 
 import subprocess
+import sys
 import os
 import wave
 import json
 import shutil
 import tempfile
 import math
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .cache import DiskCache
+from .profiling import NULL_PROFILER, Profiler
 
 # ── Backend Detection ───────────────────────────────────
 
@@ -58,223 +72,583 @@ def detect_backend():
         except ImportError:
             pass
 
-    # 4. Flite fallback (always available on Ubuntu)
+    # 4. Flite fallback (always available on Ubuntu; post-processed with NumPy)
     try:
         import ctypes
+        import numpy
         ctypes.CDLL('libflite.so.2.2')
         return "flite"
-    except OSError:
+    except (OSError, ImportError):
         pass
 
     return None
 
 
+# ── Backend Sessions ────────────────────────────────────
+
+class TTSSession:
+    """
+    A TTS backend that loads its models or libraries once and is reused
+    for every scene, and for every video rendered in the same process.
+
+    Loading happens on the first synthesize() call; close() releases it.
+    Sessions are usable as context managers.
+    """
+
+    name = None
+    seeded = True       # voice_seed changes the output (part of the cache key)
+    concurrency = 1     # scenes synthesize() may be called for at once
+
+    def __init__(self):
+        self._loaded = False
+
+    def cache_params(self):
+        """Generation settings that change the audio, for TTSCache keys."""
+        return {}
+
+    def load(self):
+        """Load models/libraries now instead of on the first synthesize()."""
+        if not self._loaded:
+            self._load()
+            self._loaded = True
+        return self
+
+    def synthesize(self, text, output_path, voice_seed=42):
+        """Write speech for text to output_path (WAV) and return the path."""
+        self.load()
+        return self._synthesize(text, output_path, voice_seed)
+
+    def synthesize_samples(self, text, voice_seed=42):
+        """(float32 samples, sample rate) of speech for text. Requires NumPy."""
+        from .audio import read_wav
+
+        fd, path = tempfile.mkstemp(prefix="reel_tts_", suffix=".wav")
+        os.close(fd)
+        try:
+            self.synthesize(text, path, voice_seed)
+            return read_wav(path)
+        finally:
+            os.remove(path)
+
+    def synthesize_many(self, jobs, voice_seed=42, profiler=None):
+        """
+        Synthesize [(scene id, text, output_path), ...], up to `concurrency`
+        at once on threads. Returns the output paths in order.
+        """
+        profiler = profiler or NULL_PROFILER
+
+        def run(job):
+            scene_id, text, path = job
+            with profiler.span("tts_generate", scene=scene_id, backend=self.name):
+                return self.synthesize(text, path, voice_seed=voice_seed)
+
+        workers = min(self.concurrency, len(jobs))
+        if workers > 1:
+            self.load()
+            with ThreadPoolExecutor(workers) as pool:
+                return list(pool.map(run, jobs))
+        return [run(job) for job in jobs]
+
+    def close(self):
+        """Release what load() acquired; the next synthesize() loads again."""
+        if self._loaded:
+            self._unload()
+            self._loaded = False
+
+    def __enter__(self):
+        return self.load()
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _load(self):
+        pass
+
+    def _unload(self):
+        pass
+
+    def _synthesize(self, text, output_path, voice_seed):
+        raise NotImplementedError
+
+
 # ── Dia Backend (HuggingFace Transformers) ──────────────
 
-def _generate_dia_hf(text, output_path, voice_seed=42, temperature=1.3, top_p=0.95):
+class DiaHFSession(TTSSession):
     """
-    Generate speech using Dia via HuggingFace Transformers.
-    
+    Speech using Dia via HuggingFace Transformers.
+
     Dia uses [S1] and [S2] speaker tags. For single-narrator Shorts,
     we use [S1] throughout. Add [S1] at the end for clean audio tail.
-    
+
     Supported non-verbal tags (use sparingly):
         (laughs), (clears throat), (sighs), (gasps), (coughs),
         (singing), (mumbles), (groans), (sniffs), (inhales), (exhales)
     """
-    import torch
-    from transformers import AutoProcessor, DiaForConditionalGeneration
 
-    device = "cuda"
-    model_id = "nari-labs/Dia-1.6B-0626"
+    name = "dia-hf"
 
-    processor = AutoProcessor.from_pretrained(model_id)
-    model = DiaForConditionalGeneration.from_pretrained(model_id).to(device)
+    def __init__(self, model_id="nari-labs/Dia-1.6B-0626", device="cuda",
+                 temperature=1.3, top_p=0.95):
+        super().__init__()
+        self.model_id = model_id
+        self.device = device
+        self.temperature = temperature
+        self.top_p = top_p
 
-    # Format text with Dia's speaker tags
-    # Single narrator = all [S1], with [S1] at end for clean tail
-    dia_text = f"[S1] {text} [S1]"
+    def cache_params(self):
+        return {"model": self.model_id, "temperature": self.temperature, "top_p": self.top_p}
 
-    inputs = processor(text=[dia_text], padding=True, return_tensors="pt").to(device)
+    def _load(self):
+        from transformers import AutoProcessor, DiaForConditionalGeneration
 
-    # Set seed for consistent voice across scenes
-    torch.manual_seed(voice_seed)
+        self.processor = AutoProcessor.from_pretrained(self.model_id)
+        self.model = DiaForConditionalGeneration.from_pretrained(self.model_id).to(self.device)
 
-    outputs = model.generate(
-        **inputs,
-        max_new_tokens=3072,
-        guidance_scale=3.0,
-        temperature=temperature,
-        top_p=top_p,
-        top_k=45,
-    )
+    def _unload(self):
+        import torch
 
-    decoded = processor.batch_decode(outputs)
-    processor.save_audio(decoded, output_path)
+        del self.model, self.processor
+        torch.cuda.empty_cache()
 
-    # Clean up GPU memory
-    del model
-    torch.cuda.empty_cache()
+    def _synthesize(self, text, output_path, voice_seed):
+        import torch
 
-    return output_path
+        # Format text with Dia's speaker tags
+        # Single narrator = all [S1], with [S1] at end for clean tail
+        dia_text = f"[S1] {text} [S1]"
+
+        inputs = self.processor(text=[dia_text], padding=True,
+                                return_tensors="pt").to(self.device)
+
+        # Set seed for consistent voice across scenes
+        torch.manual_seed(voice_seed)
+
+        outputs = self.model.generate(
+            **inputs,
+            max_new_tokens=3072,
+            guidance_scale=3.0,
+            temperature=self.temperature,
+            top_p=self.top_p,
+            top_k=45,
+        )
+
+        decoded = self.processor.batch_decode(outputs)
+        self.processor.save_audio(decoded, output_path)
+        return output_path
 
 
 # ── Dia Backend (Native Package) ────────────────────────
 
-def _generate_dia_native(text, output_path, voice_seed=42):
+class DiaNativeSession(TTSSession):
     """
-    Generate speech using Dia's native package.
+    Speech using Dia's native package.
     pip install git+https://github.com/nari-labs/dia.git
     """
-    import torch
-    from dia.model import Dia
 
-    model = Dia.from_pretrained("nari-labs/Dia-1.6B-0626", compute_dtype="float16")
+    name = "dia"
 
-    dia_text = f"[S1] {text} [S1]"
-    torch.manual_seed(voice_seed)
+    def __init__(self, model_id="nari-labs/Dia-1.6B-0626", compute_dtype="float16"):
+        super().__init__()
+        self.model_id = model_id
+        self.compute_dtype = compute_dtype
 
-    output = model.generate(
-        dia_text,
-        max_tokens=3072,
-        cfg_scale=3.0,
-        temperature=1.3,
-        top_p=0.95,
-        use_torch_compile=True,
-    )
+    def cache_params(self):
+        return {"model": self.model_id, "compute_dtype": self.compute_dtype}
 
-    import soundfile as sf
-    sf.write(output_path, output, 44100)
+    def _load(self):
+        from dia.model import Dia
 
-    del model
-    torch.cuda.empty_cache()
-
-    return output_path
+        self.model = Dia.from_pretrained(self.model_id, compute_dtype=self.compute_dtype)
 
+    def _unload(self):
+        import torch
 
-# ── Higgs Audio API Backend ─────────────────────────────
+        del self.model
+        torch.cuda.empty_cache()
 
-def _generate_higgs_api(text, output_path):
-    """
-    Generate speech via Deep Infra's hosted Higgs Audio V2.5 API.
-    Requires DEEPINFRA_API_KEY environment variable.
-    
-    Pricing: ~$20/1M characters ($0.003 per typical scene).
-    """
-    import requests
-
-    api_key = os.environ.get("DEEPINFRA_API_KEY") or os.environ.get("HIGGS_API_KEY")
-    if not api_key:
-        raise ValueError("Set DEEPINFRA_API_KEY or HIGGS_API_KEY environment variable")
+    def _synthesize(self, text, output_path, voice_seed):
+        import torch
+        import soundfile as sf
+
+        dia_text = f"[S1] {text} [S1]"
+        torch.manual_seed(voice_seed)
+
+        output = self.model.generate(
+            dia_text,
+            max_tokens=3072,
+            cfg_scale=3.0,
+            temperature=1.3,
+            top_p=0.95,
+            use_torch_compile=True,
+        )
 
-    url = "https://api.deepinfra.com/v1/inference/bosonai/HiggsAudioV2.5"
+        sf.write(output_path, output, 44100)
+        return output_path
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
 
-    payload = {
-        "text": text,
-        "output_format": "pcm",
-    }
+# ── Higgs Audio API Backend ─────────────────────────────
 
-    response = requests.post(url, headers=headers, json=payload)
-    response.raise_for_status()
+class HiggsAPISession(TTSSession):
+    """
+    Speech via Deep Infra's hosted Higgs Audio V2.5 API.
+    Requires DEEPINFRA_API_KEY environment variable.
 
-    # Save raw PCM → convert to WAV via FFmpeg
-    pcm_path = output_path + ".pcm"
-    with open(pcm_path, 'wb') as f:
-        f.write(response.content)
+    Pricing: ~$20/1M characters ($0.003 per typical scene).
 
-    # Convert PCM to WAV (assume 24kHz mono 16-bit, Higgs Audio default)
-    cmd = [
-        'ffmpeg', '-y',
-        '-f', 's16le', '-ar', '24000', '-ac', '1',
-        '-i', pcm_path,
-        '-c:a', 'pcm_s16le',
-        output_path
-    ]
-    subprocess.run(cmd, capture_output=True, check=True)
-    os.remove(pcm_path)
+    All requests share one pooled HTTP session, and generate_narration
+    sends up to `concurrency` scenes at once. 429/5xx responses and dropped
+    connections are retried with exponential backoff (honoring Retry-After).
+    The 24 kHz s16le response is written straight to WAV. base_url (or
+    HIGGS_API_BASE_URL) points the client at another server, such as the
+    bundled stand-in: python -m core.mock_higgs
+    """
 
-    return output_path
+    name = "higgs-api"
+    seeded = False
+    DEFAULT_BASE_URL = "https://api.deepinfra.com"
+    PATH = "/v1/inference/bosonai/HiggsAudioV2.5"
+    SAMPLE_RATE = 24000
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, base_url=None, api_key=None, concurrency=4, retries=4,
+                 backoff=0.5, timeout=60):
+        super().__init__()
+        base_url = base_url or os.environ.get("HIGGS_API_BASE_URL") or self.DEFAULT_BASE_URL
+        self.url = base_url.rstrip("/") + self.PATH
+        self.api_key = api_key
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+    def cache_params(self):
+        return {"url": self.url}
+
+    def _load(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        api_key = (self.api_key or os.environ.get("DEEPINFRA_API_KEY")
+                   or os.environ.get("HIGGS_API_KEY"))
+        if not api_key:
+            raise ValueError("Set DEEPINFRA_API_KEY or HIGGS_API_KEY environment variable")
+
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+        self.http.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        })
+
+    def _unload(self):
+        self.http.close()
+
+    def _post(self, payload):
+        """Response body for payload, retrying throttled and failed requests."""
+        import requests
+
+        for attempt in range(self.retries + 1):
+            delay = self.backoff * 2 ** attempt
+            try:
+                response = self.http.post(self.url, json=payload, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+            else:
+                if response.status_code not in self.RETRY_STATUS or attempt == self.retries:
+                    response.raise_for_status()
+                    return response.content
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.replace(".", "", 1).isdigit():
+                    delay = min(float(retry_after), 60)
+            time.sleep(delay)
+
+    def _synthesize(self, text, output_path, voice_seed):
+        payload = {
+            "text": text,
+            "output_format": "pcm",
+        }
+        pcm = self._post(payload)
+
+        # Raw PCM: 24kHz mono 16-bit little-endian (Higgs Audio default)
+        with wave.open(output_path, 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.SAMPLE_RATE)
+            w.writeframes(pcm[:len(pcm) - len(pcm) % 2])
+
+        return output_path
 
 
 # ── Flite Fallback Backend ──────────────────────────────
 
-def _generate_flite(text, output_path, voice='rms'):
+class FliteSession(TTSSession):
     """
-    Generate speech using Flite via ctypes. Always available offline.
+    Speech using Flite via ctypes. Always available offline.
     Voice quality is robotic — use as timing reference only.
-    
-    Available voices: 'rms' (male, deep), 'slt' (female), 
+
+    Available voices: 'rms' (male, deep), 'slt' (female),
                       'kal16' (male, neutral), 'awb' (male, Scottish)
+
+    Synthesis goes through flite_text_to_wave into memory and the voice
+    post-processing runs in NumPy (core.audio), so a scene costs no process
+    spawn or temp file. The libraries and voice stay loaded for the life of
+    the session. Flite is not thread-safe, so with workers > 1 scenes are
+    synthesized in that many worker processes, each loading the voice once
+    and kept for later calls. Requires NumPy.
     """
-    import ctypes
-
-    flite = ctypes.CDLL('libflite.so.2.2')
-    ctypes.CDLL('libflite_usenglish.so.2.2')
-    ctypes.CDLL('libflite_cmulex.so.2.2')
-    flite.flite_init()
-    flite.flite_text_to_speech.argtypes = [
-        ctypes.c_char_p, ctypes.c_void_p, ctypes.c_char_p
-    ]
-    flite.flite_text_to_speech.restype = ctypes.c_float
 
-    voice_map = {
+    name = "flite"
+    seeded = False
+
+    VOICES = {
         'rms': ('libflite_cmu_us_rms.so.2.2', 'register_cmu_us_rms'),
         'slt': ('libflite_cmu_us_slt.so.2.2', 'register_cmu_us_slt'),
         'kal16': ('libflite_cmu_us_kal16.so.2.2', 'register_cmu_us_kal16'),
         'awb': ('libflite_cmu_us_awb.so.2.2', 'register_cmu_us_awb'),
     }
 
-    lib_name, fn_name = voice_map.get(voice, voice_map['rms'])
-    voice_lib = ctypes.CDLL(lib_name)
-    register_fn = getattr(voice_lib, fn_name)
-    register_fn.restype = ctypes.c_void_p
-    voice_ptr = register_fn(None)
-
-    # Strip Dia tags if present
-    clean_text = text.replace("[S1]", "").replace("[S2]", "").strip()
-
-    raw_wav = output_path + ".raw.wav"
-    flite.flite_text_to_speech(clean_text.encode(), voice_ptr, raw_wav.encode())
-
-    # Post-process: upsample + EQ for less robotic sound
-    filters = (
-        "aresample=44100,"
-        "highpass=f=80:poles=2,"
-        "lowpass=f=8000:poles=2,"
-        "equalizer=f=300:width_type=o:width=1.5:g=4,"
-        "equalizer=f=3000:width_type=o:width=1:g=-3,"
-        "equalizer=f=6000:width_type=o:width=1:g=-6,"
-        "acompressor=threshold=-20dB:ratio=3:attack=5:release=50,"
-        "loudnorm=I=-16:TP=-1.5:LRA=11"
+    # Post-process: upsample + EQ + compression for less robotic sound
+    BANDS = (
+        ("highpass", 80),
+        ("lowpass", 8000),
+        ("peak", 300, 4, 1.5),
+        ("peak", 3000, -3, 1),
+        ("peak", 6000, -6, 1),
     )
+    COMPRESSOR = dict(threshold_db=-20, ratio=3, attack=0.005, release=0.05)
+    LOUDNESS = dict(target_lufs=-16, peak_db=-1.5)
 
-    cmd = ['ffmpeg', '-y', '-i', raw_wav, '-filter:a', filters, '-ac', '1', output_path]
-    subprocess.run(cmd, capture_output=True)
-    os.remove(raw_wav)
+    # Workers start from a clean forkserver process, never a fork of this one:
+    # narration often runs on a thread next to render pools and encoder
+    # threads (core.pipeline), and a fork could inherit their held locks
+    MP_CONTEXT = "forkserver"
 
-    return output_path
+    def __init__(self, voice='rms', workers=None):
+        super().__init__()
+        self.voice = voice if voice in self.VOICES else 'rms'
+        self.concurrency = max(1, workers or min(4, os.cpu_count() or 1))
+        self._pool = None
 
+    def cache_params(self):
+        return {"voice": self.voice, "bands": self.BANDS, "compressor": self.COMPRESSOR,
+                "loudness": self.LOUDNESS}
+
+    def _load(self):
+        import ctypes
+
+        class CstWave(ctypes.Structure):
+            _fields_ = [("type", ctypes.c_char_p), ("sample_rate", ctypes.c_int),
+                        ("num_samples", ctypes.c_int), ("num_channels", ctypes.c_int),
+                        ("samples", ctypes.POINTER(ctypes.c_short))]
+
+        # Keep references to every library so the registered voice stays valid
+        self.flite = ctypes.CDLL('libflite.so.2.2')
+        self._deps = [ctypes.CDLL('libflite_usenglish.so.2.2'),
+                      ctypes.CDLL('libflite_cmulex.so.2.2')]
+        self.flite.flite_init()
+        self.flite.flite_text_to_wave.argtypes = [ctypes.c_char_p, ctypes.c_void_p]
+        self.flite.flite_text_to_wave.restype = ctypes.POINTER(CstWave)
+        self.flite.delete_wave.argtypes = [ctypes.POINTER(CstWave)]
+        self.flite.delete_wave.restype = None
+
+        lib_name, fn_name = self.VOICES[self.voice]
+        self._voice_lib = ctypes.CDLL(lib_name)
+        register_fn = getattr(self._voice_lib, fn_name)
+        register_fn.restype = ctypes.c_void_p
+        self.voice_ptr = register_fn(None)
+
+    def close(self):
+        # The worker pool is created by synthesize_many() independently of load()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        super().close()
+
+    def synthesize_samples(self, text, voice_seed=42):
+        import numpy as np
+        from . import audio
+
+        self.load()
+        # Strip Dia tags if present
+        clean_text = text.replace("[S1]", "").replace("[S2]", "").strip()
+
+        wav = self.flite.flite_text_to_wave(clean_text.encode(), self.voice_ptr)
+        if not wav:
+            raise RuntimeError(f"Flite failed to synthesize: {clean_text[:60]!r}")
+        try:
+            w = wav.contents
+            raw = np.ctypeslib.as_array(w.samples, (w.num_samples * w.num_channels,))
+            samples = raw.reshape(-1, w.num_channels).mean(axis=1) / 32768
+            rate = w.sample_rate
+        finally:
+            self.flite.delete_wave(wav)
+
+        samples = audio.resample(samples, rate, audio.SAMPLE_RATE)
+        samples = audio.equalize(samples, audio.SAMPLE_RATE, self.BANDS)
+        samples = audio.compress(samples, audio.SAMPLE_RATE, **self.COMPRESSOR)
+        return (audio.normalize_loudness(samples, audio.SAMPLE_RATE, **self.LOUDNESS),
+                audio.SAMPLE_RATE)
+
+    def _synthesize(self, text, output_path, voice_seed):
+        from .audio import write_wav
+
+        return write_wav(output_path, *self.synthesize_samples(text))
+
+    def synthesize_many(self, jobs, voice_seed=42, profiler=None):
+        if self.concurrency == 1 or len(jobs) < 2:
+            return super().synthesize_many(jobs, voice_seed, profiler)
+
+        profiler = profiler or NULL_PROFILER
+        if self._pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            import multiprocessing
+
+            method = self.MP_CONTEXT
+            if method not in multiprocessing.get_all_start_methods():
+                method = "spawn"
+            ctx = multiprocessing.get_context(method)
+            if method == "forkserver":
+                # Importing this module gives the server our sys.path, but not __main__
+                ctx.set_forkserver_preload([__name__])
+            self._pool = ProcessPoolExecutor(self.concurrency, mp_context=ctx,
+                                             initializer=_init_flite_worker,
+                                             initargs=(self.voice,))
+        futures = [self._pool.submit(_flite_worker_job, *job, profiler.enabled)
+                   for job in jobs]
+        paths = []
+        for future in futures:
+            path, events = future.result()
+            profiler.merge(events)
+            paths.append(path)
+        return paths
+
+
+_flite_session = None
+
+
+def _init_flite_worker(voice):
+    global _flite_session
+    _flite_session = FliteSession(voice, workers=1).load()
+
+
+def _flite_worker_job(scene_id, text, path, profile):
+    profiler = Profiler() if profile else NULL_PROFILER
+    with profiler.span("tts_generate", scene=scene_id, backend="flite"):
+        _flite_session.synthesize(text, path)
+    return path, profiler.drain()
+
+
+# ── Fake Backend ────────────────────────────────────────
+
+class FakeSession(TTSSession):
+    """
+    Lightweight stand-in backend for tests and dry runs: writes a quiet
+    tone whose length follows the text (words_per_sec), deterministic per
+    (text, voice_seed). Needs no models, GPU or network.
+    """
+
+    name = "fake"
+
+    def __init__(self, words_per_sec=2.8, sample_rate=24000):
+        super().__init__()
+        self.words_per_sec = words_per_sec
+        self.sample_rate = sample_rate
+        self.calls = []
+
+    def cache_params(self):
+        return {"words_per_sec": self.words_per_sec, "sample_rate": self.sample_rate}
+
+    def _synthesize(self, text, output_path, voice_seed):
+        self.calls.append(text)
+        pcm = _tone_pcm(text, self.sample_rate, self.words_per_sec, voice_seed)
+
+        with wave.open(output_path, 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.sample_rate)
+            w.writeframes(pcm)
+        return output_path
 
-# ── Scene-Level Generation ──────────────────────────────
 
-def _generate_scene(backend, text, output_path, voice_seed=42):
-    """Route to the appropriate backend."""
-    if backend == "dia-hf":
-        return _generate_dia_hf(text, output_path, voice_seed=voice_seed)
-    elif backend == "dia":
-        return _generate_dia_native(text, output_path, voice_seed=voice_seed)
-    elif backend == "higgs-api":
-        return _generate_higgs_api(text, output_path)
-    elif backend == "flite":
-        return _generate_flite(text, output_path)
-    else:
+def _tone_pcm(text, sample_rate=24000, words_per_sec=2.8, voice_seed=42):
+    """Mono s16le tone lasting as long as text would take to speak."""
+    from array import array
+
+    words = max(1, len(text.split()))
+    n = int(words / words_per_sec * sample_rate)
+    freq = 110 + (voice_seed % 7) * 20
+    step = 2 * math.pi * freq / sample_rate
+    samples = array('h', (int(8000 * math.sin(i * step)) for i in range(n)))
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    return samples.tobytes()
+
+
+SESSION_CLASSES = {
+    cls.name: cls
+    for cls in (DiaHFSession, DiaNativeSession, HiggsAPISession, FliteSession, FakeSession)
+}
+_sessions = {}
+
+
+def get_session(backend):
+    """
+    Shared session for backend in this process, created on first use, so
+    later scenes and videos reuse the loaded model.
+    """
+    if backend not in SESSION_CLASSES:
         raise ValueError(f"Unknown backend: {backend}")
+    if backend not in _sessions:
+        _sessions[backend] = SESSION_CLASSES[backend]()
+    return _sessions[backend]
+
+
+def close_sessions():
+    """Release every shared session (models, GPU memory, HTTP pools)."""
+    while _sessions:
+        _sessions.popitem()[1].close()
+
 
+# ── Synthesis Cache ─────────────────────────────────────
+
+TTS_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+class TTSCache(DiskCache):
+    """
+    Content-addressed disk cache of raw synthesized scene WAVs.
+
+    A key hashes the backend, the normalized text, the voice seed (for
+    backends where it matters) and the session's generation settings, so
+    re-renders and phrases shared between reels skip synthesis; only the
+    stretch and mix are redone when scene timing changes. The least
+    recently used files are evicted once the cache exceeds max_bytes
+    (None for no limit).
+    """
+
+    VERSION = 1
+    SUFFIX = ".wav"
+    KIND = "tts"
+
+    def __init__(self, cache_dir=None, max_bytes=TTS_CACHE_MAX_BYTES):
+        super().__init__(cache_dir, max_bytes)
+
+    def key(self, session, text, voice_seed=42):
+        spec = {
+            "version": self.VERSION,
+            "backend": session.name,
+            "text": " ".join(text.split()),
+            "voice_seed": voice_seed if session.seeded else None,
+            "params": session.cache_params(),
+        }
+        return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+# ── Scene-Level Generation ──────────────────────────────
 
 def _time_stretch(input_wav, output_wav, target_duration):
     """
@@ -309,10 +683,53 @@ def _time_stretch(input_wav, output_wav, target_duration):
         shutil.copy2(input_wav, output_wav)
 
 
+def _synthesize_scenes(session, scenes, tmpdir, voice_seed, cache, profiler):
+    """
+    [(raw WAV path, from the disk cache)] per scene. Cache misses are
+    synthesized up to session.concurrency at a time, and a text repeated
+    across scenes once (that is not reported as cached).
+    """
+    results = [None] * len(scenes)
+    pending = {}                # cache key (or normalized text) → scene indexes
+    for i, scene in enumerate(scenes):
+        key = (cache.key(session, scene["text"], voice_seed) if cache
+               else " ".join(scene["text"].split()))
+        if key in pending:
+            pending[key].append(i)
+            continue
+        path = cache.get(key) if cache else None
+        if path is not None:
+            results[i] = (path, True)
+        else:
+            pending[key] = [i]
+
+    jobs = []
+    for key, indexes in pending.items():
+        scene = scenes[indexes[0]]
+        path = (cache.staging_path(key) if cache
+                else os.path.join(tmpdir, f"raw_{scene['id']}.wav"))
+        jobs.append((scene["id"], scene["text"], path))
+    try:
+        paths = session.synthesize_many(jobs, voice_seed=voice_seed, profiler=profiler)
+        if cache:
+            paths = [cache.commit(key) for key in pending]
+    finally:
+        if cache:
+            # Staging files of failed synthesis (committed ones were moved)
+            for key in pending:
+                cache.discard(key)
+
+    for (key, indexes), path in zip(pending.items(), paths):
+        for i in indexes:
+            results[i] = (path, False)
+    return results
+
+
 # ── Main Narration Pipeline ─────────────────────────────
 
 def generate_narration(scenes, output_dir, duration=57, voice_seed=42,
-                       backend=None, verbose=True):
+                       backend=None, verbose=True, profiler=None, session=None,
+                       cache_dir=None, stats=None):
     """
     Generate a complete narration track aligned to scene timestamps.
     
@@ -322,11 +739,28 @@ def generate_narration(scenes, output_dir, duration=57, voice_seed=42,
         duration: total video duration in seconds
         voice_seed: seed for consistent voice across scenes (Dia only)
         backend: force a specific backend, or None for auto-detect
+        session: TTSSession to synthesize with (its backend overrides
+                 backend); default is the process-wide session for the
+                 backend, so models load once across calls
+        cache_dir: directory of a content-addressed cache of raw scene WAVs
+                   (True = ~/.cache/reel-maker/tts); scenes whose text,
+                   voice and backend settings are unchanged skip synthesis
+        stats: optional dict; filled with {'tts_cache': {'hits', 'misses',
+               'evicted'}} when cache_dir is set
         verbose: print progress
-    
+        profiler: optional core.profiling.Profiler; records per-scene
+                  'tts_generate' and 'tts_stretch' spans and the final 'tts_mix'
+                  (and 'tts_write')
+
+    Stretching, loudness normalization and mixing run in process with
+    NumPy (mix_narration) and the track is written once; without NumPy
+    they fall back to FFmpeg's atempo, loudnorm and amix filters.
+
     Returns:
         Path to the final narration WAV file, aligned to video timing.
     """
+    if session is not None:
+        backend = session.name
     if backend is None:
         backend = detect_backend()
         if backend is None:
@@ -335,86 +769,158 @@ def generate_narration(scenes, output_dir, duration=57, voice_seed=42,
                 "  - Dia (recommended): pip install git+https://github.com/nari-labs/dia.git\n"
                 "  - HuggingFace Transformers: pip install transformers torch\n"
                 "  - Set DEEPINFRA_API_KEY for Higgs Audio API\n"
-                "  - Install libflite for offline fallback"
+                "  - Install libflite (and numpy) for offline fallback"
             )
 
     if verbose:
-        quality = {"dia-hf": "high", "dia": "high", "higgs-api": "high", "flite": "low (timing ref)"}
+        quality = {"dia-hf": "high", "dia": "high", "higgs-api": "high", "flite": "low (timing ref)",
+                   "fake": "none (test tone)"}
         print(f"TTS backend: {backend} (quality: {quality.get(backend, '?')})")
 
+    profiler = profiler or NULL_PROFILER
+    session = session or get_session(backend)
+    cache = None
+    if cache_dir:
+        cache = TTSCache(None if cache_dir is True else cache_dir)
     tmpdir = tempfile.mkdtemp(prefix="reel_tts_")
 
     try:
-        scene_wavs = []
+        raw_wavs = _synthesize_scenes(session, scenes, tmpdir, voice_seed, cache, profiler)
+        narration_path = os.path.join(output_dir, "narration.wav")
+
+        try:
+            from . import audio
+        except ImportError:
+            audio = None
+        if audio is not None:
+            track = mix_narration(scenes, [wav for wav, _ in raw_wavs], duration,
+                                  verbose=verbose, profiler=profiler,
+                                  cached=[c for _, c in raw_wavs])
+            with profiler.span("tts_write"):
+                audio.write_wav(narration_path, track)
+        else:
+            _mix_narration_ffmpeg(scenes, raw_wavs, duration, narration_path, tmpdir,
+                                  verbose, profiler)
 
-        for scene in scenes:
-            scene_dur = scene["end"] - scene["start"]
-            # Leave 0.3s padding at start, 0.3s at end
-            target_speech_dur = scene_dur - 0.6
-            if target_speech_dur < 1.0:
-                target_speech_dur = scene_dur - 0.2
+        if verbose:
+            with wave.open(narration_path, 'rb') as w:
+                total = w.getnframes() / w.getframerate()
+            print(f"\n  ✅ Narration: {narration_path} ({total:.1f}s)")
 
+        return narration_path
+
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+        if cache:
+            cache.evict()
+            if stats is not None:
+                stats["tts_cache"] = cache.stats()
             if verbose:
-                print(f"\n  Scene {scene['id']} ({scene['start']}s-{scene['end']}s, "
-                      f"speech target: {target_speech_dur:.1f}s)")
+                print(f"  TTS cache: {cache.hits} hits, {cache.misses} misses")
 
-            # Generate raw TTS
-            raw_wav = os.path.join(tmpdir, f"raw_{scene['id']}.wav")
-            _generate_scene(backend, scene["text"], raw_wav, voice_seed=voice_seed)
 
-            # Time-stretch to fit scene
-            stretched_wav = os.path.join(tmpdir, f"stretched_{scene['id']}.wav")
-            _time_stretch(raw_wav, stretched_wav, target_speech_dur)
+def _speech_target(scene):
+    """Seconds of speech fitted into scene, leaving 0.3s padding at each end."""
+    scene_dur = scene["end"] - scene["start"]
+    target_speech_dur = scene_dur - 0.6
+    if target_speech_dur < 1.0:
+        target_speech_dur = scene_dur - 0.2
+    return target_speech_dur
 
-            if verbose:
-                with wave.open(stretched_wav, 'rb') as w:
-                    final = w.getnframes() / w.getframerate()
-                print(f"    Stretched: {final:.1f}s")
-
-            scene_wavs.append((scene, stretched_wav))
-
-        # Align each scene to its exact timestamp using adelay + amix
-        inputs = []
-        filter_parts = []
-
-        for i, (scene, wav) in enumerate(scene_wavs):
-            inputs.extend(['-i', wav])
-            delay_ms = int((scene["start"] + 0.3) * 1000)
-            filter_parts.append(
-                f"[{i}]adelay={delay_ms}|{delay_ms},"
-                f"apad=whole_dur={duration}[s{i}]"
-            )
 
-        mix_in = "".join(f"[s{i}]" for i in range(len(scene_wavs)))
-        n = len(scene_wavs)
-        filter_parts.append(
-            f"{mix_in}amix=inputs={n}:duration=first:dropout_transition=0,"
-            f"volume={n}[out]"
-        )
+def _speech_offset(scene, rate=44100):
+    """First sample of scene's speech (0.3s in), on the millisecond grid adelay used."""
+    delay_ms = int((scene["start"] + 0.3) * 1000)
+    return delay_ms * rate // 1000
 
-        narration_path = os.path.join(output_dir, "narration.wav")
-        cmd = [
-            'ffmpeg', '-y', *inputs,
-            '-filter_complex', ";".join(filter_parts),
-            '-map', '[out]',
-            '-c:a', 'pcm_s16le', '-ar', '44100', '-ac', '1',
-            '-t', str(duration),
-            narration_path
-        ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise RuntimeError(f"FFmpeg mix failed: {result.stderr[:500]}")
+def mix_narration(scenes, raw_wavs, duration=57, verbose=False, profiler=None, cached=None):
+    """
+    Narration track as a float32 44.1 kHz NumPy buffer, from one raw WAV
+    per scene: each is time-stretched (WSOLA) to its speech target,
+    normalized to -16 LUFS (EBU R128, true peak ≤ -1.5 dB) and added at
+    its scene offset into a single duration-long buffer. Requires NumPy.
+    """
+    from . import audio
 
+    profiler = profiler or NULL_PROFILER
+    rate = audio.SAMPLE_RATE
+    clips = []
+    for i, (scene, raw_wav) in enumerate(zip(scenes, raw_wavs)):
+        target_speech_dur = _speech_target(scene)
         if verbose:
-            with wave.open(narration_path, 'rb') as w:
-                total = w.getnframes() / w.getframerate()
-            print(f"\n  ✅ Narration: {narration_path} ({total:.1f}s)")
+            print(f"\n  Scene {scene['id']} ({scene['start']}s-{scene['end']}s, "
+                  f"speech target: {target_speech_dur:.1f}s)")
+            if cached and cached[i]:
+                print("    Cached synthesis")
+
+        with profiler.span("tts_stretch", scene=scene["id"]):
+            samples, raw_rate = audio.read_wav(raw_wav)
+            samples = audio.fit_duration(samples, raw_rate, target_speech_dur, rate)
+        if verbose:
+            print(f"    Stretched: {len(samples) / rate:.1f}s")
+        clips.append((_speech_offset(scene, rate), samples))
 
-        return narration_path
+    with profiler.span("tts_mix"):
+        return audio.mix_at(clips, int(round(duration * rate)))
 
-    finally:
-        shutil.rmtree(tmpdir, ignore_errors=True)
+
+def _mix_narration_ffmpeg(scenes, raw_wavs, duration, narration_path, tmpdir, verbose,
+                          profiler):
+    """mix_narration's FFmpeg equivalent (atempo, loudnorm, adelay + amix) without NumPy."""
+    scene_wavs = []
+    for scene, (raw_wav, cached) in zip(scenes, raw_wavs):
+        target_speech_dur = _speech_target(scene)
+        if verbose:
+            print(f"\n  Scene {scene['id']} ({scene['start']}s-{scene['end']}s, "
+                  f"speech target: {target_speech_dur:.1f}s)")
+            if cached:
+                print("    Cached synthesis")
+
+        # Time-stretch to fit scene
+        stretched_wav = os.path.join(tmpdir, f"stretched_{scene['id']}.wav")
+        with profiler.span("tts_stretch", scene=scene["id"]):
+            _time_stretch(raw_wav, stretched_wav, target_speech_dur)
+
+        if verbose:
+            with wave.open(stretched_wav, 'rb') as w:
+                final = w.getnframes() / w.getframerate()
+            print(f"    Stretched: {final:.1f}s")
+
+        scene_wavs.append((scene, stretched_wav))
+
+    # Align each scene to its exact timestamp using adelay + amix
+    inputs = []
+    filter_parts = []
+
+    for i, (scene, wav) in enumerate(scene_wavs):
+        inputs.extend(['-i', wav])
+        delay_ms = int((scene["start"] + 0.3) * 1000)
+        filter_parts.append(
+            f"[{i}]adelay={delay_ms}|{delay_ms},"
+            f"apad=whole_dur={duration}[s{i}]"
+        )
+
+    mix_in = "".join(f"[s{i}]" for i in range(len(scene_wavs)))
+    n = len(scene_wavs)
+    filter_parts.append(
+        f"{mix_in}amix=inputs={n}:duration=first:dropout_transition=0,"
+        f"volume={n}[out]"
+    )
+
+    cmd = [
+        'ffmpeg', '-y', *inputs,
+        '-filter_complex', ";".join(filter_parts),
+        '-map', '[out]',
+        '-c:a', 'pcm_s16le', '-ar', '44100', '-ac', '1',
+        '-t', str(duration),
+        narration_path
+    ]
+
+    with profiler.span("tts_mix"):
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg mix failed: {result.stderr[:500]}")
 
 
 # ── Audio/Video Muxing ──────────────────────────────────
@@ -423,6 +929,8 @@ def mux_audio_video(video_path, audio_path, output_path, verbose=True):
     """
     Mux narration audio into a silent MP4 video.
     Video is copied (not re-encoded). Audio is encoded as AAC 192kbps.
+    When rendering, render_to_mp4(..., audio=) does this in the encode
+    pass and avoids rewriting the finished file.
     """
     cmd = [
         'ffmpeg', '-y',
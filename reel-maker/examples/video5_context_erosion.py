@@ -10,6 +10,7 @@ import sys
 import os
 import math
 import struct
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
 
 # ── Config ──────────────────────────────────────────────────
@@ -51,6 +52,7 @@ def _find_font_dir():
 
 FONT_DIR = _find_font_dir()
 
+@lru_cache(maxsize=None)
 def font(size, bold=False):
     name = "DejaVuSansMono-Bold.ttf" if bold else "DejaVuSansMono.ttf"
     try:
@@ -58,6 +60,7 @@ def font(size, bold=False):
     except OSError:
         return ImageFont.load_default(size)
 
+@lru_cache(maxsize=None)
 def font_sans(size, bold=False):
     name = "DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf"
     return ImageFont.truetype(FONT_DIR + name, size)
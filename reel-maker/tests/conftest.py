@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the skill's modules as `core.*`, like the examples do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,18 @@
+import pytest
+
+from core.animation import Animation, tween
+
+SCENE = {"id": 1, "start": 0, "end": 2, "label": "Intro", "color": (255, 255, 255)}
+
+
+def test_animation_without_tracks_is_rejected():
+    with pytest.raises(ValueError, match="at least one track"):
+        Animation(SCENE)
+
+
+def test_animation_at_on_and_off_the_frame_grid():
+    anim = Animation(SCENE, fps=30, op=tween(0, 1, start=0.5, end=1))
+    assert anim.at(0.0).op == 0
+    assert anim.at(1.0).op == 1
+    assert anim.at(0.75).op == pytest.approx(0.5)
+    assert anim.at(0.123456).op == 0       # not a frame progress; evaluated on demand
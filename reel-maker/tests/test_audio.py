@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from core import audio
+from core.tts import _speech_offset
+
+RATE = audio.SAMPLE_RATE
+
+
+def _speech_like(seconds, seed=0):
+    """Noise with a syllable-rate (4 Hz) envelope, roughly speech-shaped for BS.1770."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * RATE)) / RATE
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2
+    return (rng.standard_normal(len(t)) * envelope * 0.05).astype(np.float32)
+
+
+def test_mix_at_places_clips_at_their_speech_offset():
+    scenes = [{"id": 1, "start": 0}, {"id": 2, "start": 1.25}, {"id": 3, "start": 2.0}]
+    assert [_speech_offset(s) for s in scenes] == [13230, 68355, 101430]
+
+    click = np.array([1.0, -0.5], np.float32)
+    out = audio.mix_at([(_speech_offset(s), click) for s in scenes]
+                       + [(3 * RATE - 1, click)], 3 * RATE)   # cut at the end
+    assert len(out) == 3 * RATE
+    assert list(np.flatnonzero(out)) == [13230, 13231, 68355, 68356, 101430, 101431,
+                                         3 * RATE - 1]
+    assert out[68355] == 1.0 and out[68356] == -0.5
+
+
+def test_loudness_of_a_full_scale_sine():
+    t = np.arange(3 * RATE) / RATE
+    # BS.1770: a 0 dBFS 997 Hz sine reads -3.01 LUFS
+    assert audio.loudness(np.sin(2 * np.pi * 997 * t), RATE) == pytest.approx(-3.01, abs=0.05)
+
+
+@pytest.mark.parametrize("gain", [0.1, 1.0, 8.0])
+def test_normalize_loudness_hits_target_under_the_peak_ceiling(gain):
+    out = audio.normalize_loudness(_speech_like(4) * gain, RATE)
+    assert audio.loudness(out, RATE) == pytest.approx(-16.0, abs=0.5)
+    assert audio.db(audio.true_peak(out)) <= -1.5 + 1e-6
+
+
+def test_normalize_loudness_lowers_gain_for_the_true_peak():
+    samples = _speech_like(4)
+    samples[RATE] = 2.0                        # one spike far above the speech
+    out = audio.normalize_loudness(samples, RATE)
+    assert audio.db(audio.true_peak(out)) == pytest.approx(-1.5, abs=1e-3)
+    assert audio.loudness(out, RATE) < -16.0
+
+
+@pytest.mark.parametrize("length", [1, 1000, RATE, 2 * RATE, 3 * RATE, 5 * RATE])
+def test_time_stretch_returns_exactly_length_samples(length):
+    samples = _speech_like(2)
+    out = audio.time_stretch(samples, length)
+    assert out.dtype == np.float32 and len(out) == length
+    assert np.isfinite(out).all()
+
+
+@pytest.mark.parametrize("factor", [0.6, 1.7])
+def test_time_stretch_keeps_pitch_and_level(factor):
+    t = np.arange(2 * RATE) / RATE
+    tone = (0.5 * np.cos(2 * np.pi * 220 * t)).astype(np.float32)
+    length = int(len(tone) * factor)
+    out = audio.time_stretch(tone, length)
+    spectrum = np.abs(np.fft.rfft(out))
+    assert np.fft.rfftfreq(length, 1 / RATE)[spectrum.argmax()] == pytest.approx(220, abs=1)
+    # No fade at either end
+    assert np.abs(out[:200]).max() > 0.45 and np.abs(out[-200:]).max() > 0.45
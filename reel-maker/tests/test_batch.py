@@ -0,0 +1,69 @@
+import os
+import threading
+
+import pytest
+
+from core import batch
+from core.batch import render_batch
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "examples", "video5_context_erosion.py")
+
+EMPTY_RENDERER = '''
+SCENES = {scenes}
+CAPTIONS = []
+DURATION = 0
+
+
+def draw_scene1(draw, img, p):
+    pass
+'''
+
+
+@pytest.mark.parametrize("scenes", [
+    [],
+    [{"id": 1, "start": 0, "end": 1, "label": "Empty", "color": (255, 255, 255)}],
+])
+def test_empty_job_fails_without_blocking_the_batch(tmp_path, scenes):
+    renderer = tmp_path / "empty.py"
+    renderer.write_text(EMPTY_RENDERER.format(scenes=scenes))
+    jobs = [{"name": "empty", "renderer": str(renderer), "output": str(tmp_path / "empty.mp4")}]
+
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(
+        render_batch(jobs, workers=1, validate=False, verbose=False)), daemon=True)
+    thread.start()
+    thread.join(timeout=60)
+    assert not thread.is_alive(), "render_batch waited on a job with no segments"
+
+    [result] = results
+    assert not result["ok"]
+    assert result["error"].startswith("no frames to render")
+
+
+@pytest.mark.parametrize("reuse_buffer", [None, False, True])
+def test_batch_worker_render_frame_with_and_without_reuse_buffer(monkeypatch, reuse_buffer):
+    job = {"name": "v5", "renderer": EXAMPLE, "output": "v5.mp4", "duration": 2}
+    if reuse_buffer is not None:
+        job["reuse_buffer"] = reuse_buffer
+    monkeypatch.setattr(batch, "_jobs", [job])
+    monkeypatch.setattr(batch, "_job_frames", batch.OrderedDict())
+
+    render_frame = batch._job_render_frame(0)
+    assert render_frame.pix_fmt == ("rgb0" if reuse_buffer else "rgb24")
+    assert render_frame(1.0).size == (1080, 1920)
+
+
+def test_batch_worker_keeps_only_recent_render_frames(monkeypatch):
+    jobs = [{"name": f"v{j}", "renderer": EXAMPLE, "output": f"v{j}.mp4", "duration": 2,
+             "reuse_buffer": True} for j in range(4)]
+    monkeypatch.setattr(batch, "_jobs", jobs)
+    monkeypatch.setattr(batch, "_job_frames", batch.OrderedDict())
+
+    first = batch._job_render_frame(0)
+    batch._job_render_frame(1)
+    assert batch._job_render_frame(0) is first      # reused, and now most recent
+    batch._job_render_frame(2)
+    batch._job_render_frame(3)
+    assert list(batch._job_frames) == [2, 3]
+    assert len(batch._job_frames) == batch.JOB_FRAMES_KEPT
@@ -0,0 +1,239 @@
+import ast
+import importlib.util
+import multiprocessing
+import os
+import shlex
+import shutil
+import stat
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from core.renderer import SegmentCache, _concat_segments, _segment_key, render_to_mp4, rgb_to_yuv420p
+from core.scene_base import make_render_frame
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "examples", "video5_context_erosion.py")
+
+
+def _real_ffmpeg():
+    if not shutil.which("ffmpeg"):
+        return False
+    try:
+        out = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True)
+    except OSError:
+        return False
+    return out.returncode == 0 and out.stdout.startswith("ffmpeg version")
+
+
+def _example():
+    spec = importlib.util.spec_from_file_location("video5_test", EXAMPLE)
+    video = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(video)
+    renderers = {s["id"]: getattr(video, f"draw_scene{s['id']}") for s in video.SCENES}
+    return video, renderers
+
+
+def _example_frame(t):
+    video, renderers = _example()
+    render_frame = make_render_frame(video.SCENES, video.CAPTIONS, renderers, 57)
+    return render_frame(t).tobytes(), render_frame.size
+
+
+@pytest.mark.skipif(not _real_ffmpeg(), reason="needs FFmpeg")
+@pytest.mark.parametrize("t", [2, 30, 44])
+def test_rgb_to_yuv420p_matches_ffmpeg_within_documented_bounds(t):
+    data, (w, h) = _example_frame(t)
+    ffmpeg = subprocess.run(
+        ["ffmpeg", "-v", "error", "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{w}x{h}",
+         "-i", "-", "-f", "rawvideo", "-pix_fmt", "yuv420p", "-"],
+        input=data, capture_output=True, check=True).stdout
+    ours = rgb_to_yuv420p(data, (w, h)).astype(np.int16)
+    theirs = np.frombuffer(ffmpeg, np.uint8).astype(np.int16)
+    assert ours.shape == theirs.shape
+
+    diff = np.abs(ours - theirs)
+    assert diff[:w * h].max() <= 1            # luma
+    assert diff[w * h:].max() <= 16           # chroma: box vs swscale filter (export_specs.md)
+    assert diff[w * h:].mean() < 0.5          # flat areas match
+
+
+def test_rgb_to_yuv420p_limited_range_and_rgb0():
+    w, h = 4, 2
+    rgb = np.zeros((h, w, 3), np.uint8)
+    rgb[:, 2:] = 255
+    out = rgb_to_yuv420p(rgb.tobytes(), (w, h))
+    assert list(out[:w * h]) == [16, 16, 235, 235] * 2
+    assert list(out[w * h:]) == [128, 128, 128, 128]
+
+    rgb0 = np.concatenate([rgb, np.zeros((h, w, 1), np.uint8)], axis=2)
+    assert np.array_equal(rgb_to_yuv420p(rgb0.tobytes(), (w, h), channels=4), out)
+
+
+SCENE = {"id": 1, "start": 0, "end": 2, "label": "Intro", "color": (255, 255, 255)}
+
+
+def _renderer_key(source):
+    """Segment key of a renderer defined by source, with module globals of its own."""
+    namespace = {}
+    exec("import threading\nfrom functools import lru_cache, partial\n"
+         "from core.animation import Animation, tween\n"
+         "from core.drawing import font_mono\n"
+         f"SCENE = {SCENE!r}\n{source}", namespace)
+    return _segment_key([SCENE], [], {1: namespace["renderer"]}, {}, 2, 30, 0, 60, SCENE, {})
+
+
+def test_segment_key_follows_lru_cache_wrapped_helpers():
+    helper = "@lru_cache\ndef helper(x):\n    return x + {}\n" \
+             "def renderer(draw, img, p):\n    helper(p)\n"
+    assert _renderer_key(helper.format(1)) == _renderer_key(helper.format(1))
+    assert _renderer_key(helper.format(1)) != _renderer_key(helper.format(2))
+
+
+@pytest.mark.parametrize("module_value", [
+    "TITLE = font_mono({})",
+    "ANIM = Animation(SCENE, op=tween(0, 1, start=0.{}))",
+    "ANIMS = [Animation(SCENE, op=tween(0, {}))]",
+    "def helper(x, n):\n    return x * n\nSTEP = partial(helper, {})",
+])
+def test_segment_key_fingerprints_module_level_values(module_value):
+    renderer = "\ndef renderer(draw, img, p):\n    TITLE, ANIM, ANIMS, STEP\n"
+    # Same content built twice (new objects, new addresses) gives the same key
+    assert _renderer_key(module_value.format(4) + renderer) == \
+        _renderer_key(module_value.format(4) + renderer)
+    assert _renderer_key(module_value.format(4) + renderer) != \
+        _renderer_key(module_value.format(5) + renderer)
+
+
+def test_segment_key_is_none_for_values_without_a_fingerprint():
+    assert _renderer_key("LOCK = threading.Lock()\n"
+                         "def renderer(draw, img, p):\n    LOCK\n") is None
+
+
+def test_segment_cache_evicts_least_recently_used(tmp_path):
+    cache = SegmentCache(str(tmp_path), max_bytes=250)
+    now = time.time()
+    for age, key in enumerate(["c", "b", "a"]):
+        with open(cache.path(key), "wb") as f:
+            f.write(b"x" * 100)
+        os.utime(cache.path(key), (now - age * 10, now - age * 10))
+    open(os.path.join(str(tmp_path), "d.123.tmp.mp4"), "wb").close()
+
+    assert cache.evict() == 200
+    assert cache.get("a") is None and cache.get("b") and cache.get("c")
+    assert cache.stats() == {"hits": 2, "misses": 1, "evicted": 1}
+    assert SegmentCache(str(tmp_path), max_bytes=None).evict() == 200
+
+
+def _fake_ffmpeg(tmp_path, monkeypatch, exit_code):
+    """Put an ffmpeg on PATH that creates its output, reads stdin and exits."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    ffmpeg = bin_dir / "ffmpeg"
+    ffmpeg.write_text('#!/bin/sh\nfor a; do out="$a"; done\n: > "$out"\n'
+                      f'cat > /dev/null\nexit {exit_code}\n')
+    ffmpeg.chmod(ffmpeg.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+
+@pytest.mark.skipif(os.name != "posix", reason="fake ffmpeg is a shell script")
+def test_failed_segment_encode_leaves_no_staging_file(tmp_path, monkeypatch):
+    _fake_ffmpeg(tmp_path, monkeypatch, exit_code=1)
+    video, renderers = _example()
+    cache_dir = tmp_path / "cache"
+    assert not render_to_mp4(video.SCENES, video.CAPTIONS, renderers,
+                             str(tmp_path / "out.mp4"), duration=1, workers=1,
+                             cache_dir=str(cache_dir), verbose=False)
+    assert os.listdir(cache_dir) == []
+
+
+@pytest.mark.skipif(os.name != "posix", reason="fake ffmpeg is a shell script")
+def test_cached_segments_do_not_depend_on_workers(tmp_path, monkeypatch):
+    _fake_ffmpeg(tmp_path, monkeypatch, exit_code=0)
+    video, renderers = _example()
+    runs = []
+    for workers in (1, 2):
+        stats = {}
+        assert render_to_mp4(video.SCENES, video.CAPTIONS, renderers,
+                             str(tmp_path / "out.mp4"), duration=9, workers=workers,
+                             cache_dir=str(tmp_path / "cache"), verbose=False, stats=stats)
+        runs.append(stats["cache"])
+    assert runs[0]["misses"] > 1 and runs[0]["hits"] == 0
+    assert runs[1] == {"hits": runs[0]["misses"], "misses": 0, "evicted": 0}
+
+
+@pytest.mark.skipif(os.name != "posix", reason="fake ffmpeg is a shell script")
+def test_concat_list_escapes_apostrophes(tmp_path, monkeypatch):
+    _fake_ffmpeg(tmp_path, monkeypatch, exit_code=0)
+    workdir = tmp_path / "it's here"
+    workdir.mkdir()
+    paths = [str(workdir / "seg_000.mp4"), str(workdir / "o'neil's.mp4")]
+    ok, _ = _concat_segments(paths, str(tmp_path / "out.mp4"), str(workdir))
+    assert ok
+    with open(workdir / "segments.txt") as f:
+        assert [shlex.split(line) for line in f] == [["file", p] for p in paths]
+
+
+PIPE_FFMPEG = """#!{python}
+import os, sys, threading
+args = sys.argv[1:]
+sizes = {{}}
+
+def read(name, f):
+    sizes[name] = sum(len(b) for b in iter(lambda: f.read(65536), b""))
+
+threads = []
+for i, a in enumerate(args[:-1]):
+    if a == "-i" and (args[i + 1] == "-" or args[i + 1].startswith("pipe:")):
+        src = args[i + 1]
+        f = sys.stdin.buffer if src == "-" else os.fdopen(int(src[5:]), "rb")
+        threads.append(threading.Thread(target=read, args=(src.split(":")[0], f)))
+        threads[-1].start()
+for t in threads:
+    t.join()
+with open(args[-1], "w") as out:
+    out.write(repr(sorted(sizes.items())))
+"""
+
+
+@pytest.mark.skipif(os.name != "posix", reason="narration pipes need POSIX")
+def test_late_narration_is_piped_into_the_single_encode(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    ffmpeg = bin_dir / "ffmpeg"
+    ffmpeg.write_text(PIPE_FFMPEG.format(python=sys.executable))
+    ffmpeg.chmod(ffmpeg.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    narration = Future()
+    threading.Timer(0.5, narration.set_result, ((np.zeros(22050, np.float32), 22050),)).start()
+    video, renderers = _example()
+    assert render_to_mp4(video.SCENES, video.CAPTIONS, renderers, str(tmp_path / "out.mp4"),
+                         duration=1, draft=True, verbose=False, audio=narration)
+    with open(tmp_path / "out.mp4") as f:
+        sizes = dict(ast.literal_eval(f.read()))
+    # One encode read both inputs: the frames and 1 s of audio resampled to 44.1 kHz
+    assert sizes == {"-": 15 * 540 * 960 * 3, "pipe": 44100 * 2}
+
+
+@pytest.mark.skipif(os.name != "posix", reason="fake ffmpeg is a shell script")
+@pytest.mark.parametrize("segments", [False, True])
+def test_workers_started_after_fork_before_threads(tmp_path, monkeypatch, segments):
+    _fake_ffmpeg(tmp_path, monkeypatch, exit_code=0)
+    video, renderers = _example()
+    seen = []
+
+    def started():
+        seen.append((len(multiprocessing.active_children()), threading.active_count()))
+
+    threads = threading.active_count()
+    assert render_to_mp4(video.SCENES, video.CAPTIONS, renderers, str(tmp_path / "out.mp4"),
+                         duration=1, draft=True, workers=2, segments=segments, verbose=False,
+                         on_workers_started=started)
+    # Workers forked, and no threads yet beyond the pool's own three handlers
+    assert seen == [(2, threads + 3)]
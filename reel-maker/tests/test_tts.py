@@ -0,0 +1,163 @@
+import os
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from core.mock_higgs import MockHiggsServer
+from core.tts import (FakeSession, FliteSession, HiggsAPISession, TTSCache,
+                      generate_narration, get_session)
+
+
+def _fake_flite(monkeypatch):
+    """Stand in for libflite: _load sets self.flite, synthesis needs it."""
+    def load(self):
+        self.flite = "loaded"
+
+    def synthesize_samples(self, text, voice_seed=42):
+        self.load()
+        assert self.flite == "loaded"
+        return np.zeros(4410, np.float32), 44100
+
+    # Forked workers inherit the stand-ins; forkserver ones would not
+    monkeypatch.setattr(FliteSession, "MP_CONTEXT", "fork")
+    monkeypatch.setattr(FliteSession, "_load", load)
+    monkeypatch.setattr(FliteSession, "synthesize_samples", synthesize_samples)
+
+
+def test_flite_session_mixed_batch_and_single_calls(tmp_path, monkeypatch):
+    _fake_flite(monkeypatch)
+    session = FliteSession(workers=2)
+    jobs = [(i, f"scene {i}", str(tmp_path / f"scene_{i}.wav")) for i in range(2)]
+
+    assert session.synthesize_many(jobs) == [path for _, _, path in jobs]
+    assert session._pool is not None
+    assert session.synthesize_many(jobs[:1]) == [jobs[0][2]]
+    single = session.synthesize("once more", str(tmp_path / "single.wav"))
+    assert os.path.exists(single)
+
+    session.close()
+    assert session._pool is None and not session._loaded
+    assert session.synthesize_many(jobs) == [path for _, _, path in jobs]
+    session.close()
+
+
+class _FailingSession(FakeSession):
+    """Writes part of the first WAV, then fails like a crashed backend."""
+
+    def synthesize_many(self, jobs, voice_seed=42, profiler=None):
+        with open(jobs[0][2], "wb") as f:
+            f.write(b"RIFF")
+        raise RuntimeError("backend crashed")
+
+
+def test_failed_synthesis_leaves_no_staging_file(tmp_path):
+    scenes = [{"id": 1, "start": 0, "end": 3, "text": "hello there"}]
+    with pytest.raises(RuntimeError, match="backend crashed"):
+        generate_narration(scenes, str(tmp_path), duration=3, session=_FailingSession(),
+                           cache_dir=str(tmp_path / "cache"), verbose=False)
+    assert os.listdir(tmp_path / "cache") == []
+
+
+def test_tts_cache_without_size_limit_and_stale_staging(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=None)
+    with open(cache.path("a"), "wb") as f:
+        f.write(b"x" * 100)
+    with open(cache.staging_path("b"), "wb") as f:
+        f.write(b"x" * 10)
+    stale = os.path.join(str(tmp_path), "c.999.tmp.wav")
+    open(stale, "wb").close()
+    os.utime(stale, (0, 0))
+
+    assert cache.evict() == 100
+    assert sorted(os.listdir(tmp_path)) == sorted(["a.wav", os.path.basename(
+        cache.staging_path("b"))])
+    assert cache.evicted == 0
+
+
+def test_repeated_text_is_not_reported_as_cached(tmp_path, capsys):
+    scenes = [{"id": i, "start": 3 * (i - 1), "end": 3 * i, "text": "same words"}
+              for i in (1, 2)]
+    session = FakeSession()
+    generate_narration(scenes, str(tmp_path), duration=6, session=session)
+    assert session.calls == ["same words"]
+    assert "Cached synthesis" not in capsys.readouterr().out
+
+
+def test_generate_narration_with_fake_backend_and_cache(tmp_path):
+    scenes = [{"id": 1, "start": 0, "end": 3, "text": "Your agent starts sharp."},
+              {"id": 2, "start": 3, "end": 7, "text": "Every turn adds tokens."}]
+    session = get_session("fake")
+    runs = []
+    for edit in (None, None, "It drifts off course."):
+        if edit:
+            scenes[1]["text"] = edit
+        calls = len(session.calls)
+        stats = {}
+        path = generate_narration(scenes, str(tmp_path), duration=7, backend="fake",
+                                  cache_dir=str(tmp_path / "cache"), stats=stats,
+                                  verbose=False)
+        runs.append((session.calls[calls:], stats["tts_cache"]))
+        with wave.open(path) as w:
+            assert w.getframerate() == 44100 and w.getnframes() == 7 * 44100
+
+    # Unchanged text comes from the cache; an edited scene is synthesized again
+    assert runs == [
+        (["Your agent starts sharp.", "Every turn adds tokens."],
+         {"hits": 0, "misses": 2, "evicted": 0}),
+        ([], {"hits": 2, "misses": 0, "evicted": 0}),
+        (["It drifts off course."], {"hits": 1, "misses": 1, "evicted": 0}),
+    ]
+
+
+def _higgs(server, **kwargs):
+    pytest.importorskip("requests")
+    return HiggsAPISession(base_url=server.base_url, api_key="test", **kwargs)
+
+
+def _higgs_jobs(tmp_path, n):
+    return [(i, f"scene number {i}", str(tmp_path / f"scene_{i}.wav")) for i in range(n)]
+
+
+def test_higgs_retries_throttled_requests(tmp_path):
+    with MockHiggsServer(fail_first=2) as server:
+        session = _higgs(server, concurrency=1, backoff=0.01)
+        path = session.synthesize("hello there", str(tmp_path / "out.wav"))
+        session.close()
+    assert server.requests == 3 and server.texts == ["hello there"]
+    with wave.open(path) as w:
+        assert w.getframerate() == HiggsAPISession.SAMPLE_RATE and w.getnframes() > 0
+
+
+def test_higgs_honors_retry_after(tmp_path):
+    # Backoff alone would wait 30 s; Retry-After says 0.2 s per failure
+    with MockHiggsServer(fail_first=2, retry_after=0.2) as server:
+        session = _higgs(server, concurrency=1, backoff=30)
+        start = time.perf_counter()
+        session.synthesize("hello there", str(tmp_path / "out.wav"))
+        elapsed = time.perf_counter() - start
+        session.close()
+    assert server.requests == 3
+    assert 0.4 <= elapsed < 5
+
+
+def test_higgs_concurrency_is_bounded(tmp_path):
+    jobs = _higgs_jobs(tmp_path, 8)
+    with MockHiggsServer(latency=0.1) as server:
+        session = _higgs(server, concurrency=3)
+        assert session.synthesize_many(jobs) == [path for _, _, path in jobs]
+        session.close()
+    assert server.requests == 8
+    assert 1 < server.max_active <= 3
+
+
+def test_higgs_persistent_server_error_surfaces_after_retries(tmp_path):
+    requests = pytest.importorskip("requests")
+    with MockHiggsServer(fail_every=1) as server:
+        session = _higgs(server, concurrency=1, retries=2, backoff=0.01)
+        with pytest.raises(requests.HTTPError) as excinfo:
+            session.synthesize("hello there", str(tmp_path / "out.wav"))
+        session.close()
+    assert excinfo.value.response.status_code == 503
+    assert server.requests == 3                # the first try and two retries